@@ -5,8 +5,7 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from utils import utils, inspector, dates
 
 
 # http://www.usda.gov/oig/rptsaudits.htm
@@ -157,7 +156,7 @@ def run(options):
       if report:
         inspector.save_report(report)
 
-DATE_FORMATS = ['%m/%d/%Y', '%m/%Y']
+DATES = dates.Parser('%m/%d/%Y', '%m/%Y')
 
 def report_from(result, page_url, year_range, report_type, agency_slug="agriculture"):
   published_on = None
@@ -192,11 +191,7 @@ def report_from(result, page_url, year_range, report_type, agency_slug="agricult
       title = title[:title.find('(')].strip()
 
     published_on_text = published_on_element.text.strip().rstrip(":")
-    for date_format in DATE_FORMATS:
-      try:
-        published_on = datetime.datetime.strptime(published_on_text, date_format)
-      except ValueError:
-        pass
+    published_on = DATES.parse(published_on_text)
 
   # Normalize titles
   title = title.rstrip(",")
@@ -278,11 +273,7 @@ def report_from(result, page_url, year_range, report_type, agency_slug="agricult
       pass
   if not published_on:
     published_on_text = result.text.split()[0].strip()
-    for date_format in DATE_FORMATS:
-      try:
-        published_on = datetime.datetime.strptime(published_on_text, date_format)
-      except ValueError:
-        pass
+    published_on = DATES.parse(published_on_text)
 
   if published_on.year not in year_range:
     logging.debug("[%s] Skipping, not in requested range." % report_url)
@@ -306,7 +297,7 @@ def report_from(result, page_url, year_range, report_type, agency_slug="agricult
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.parse_html(body)
 
 def ancestor_tag_by_name(element, name):
   for parent in element.parents:
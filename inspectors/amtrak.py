@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 
 from utils import utils, inspector
-from bs4 import BeautifulSoup
 from datetime import datetime
 
 archive = 2006
@@ -21,7 +20,7 @@ def run(options):
       url = url_for(options, index, year)
       body = utils.download(url)
 
-      doc = BeautifulSoup(body)
+      doc = utils.parse_html(body)
 
       results = doc.select("div.view-content div.views-row")
       for result in results:
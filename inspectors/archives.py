@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.archives.gov/oig/
@@ -30,7 +29,7 @@ def run(options):
     if year < 2006:  # The oldest year for audit reports
       continue
     url = AUDIT_REPORTS_URL.format(year=year)
-    doc = BeautifulSoup(utils.download(url))
+    doc = utils.parse_html(utils.download(url))
     results = doc.select("div#content li")
     if not results:
       raise inspector.NoReportsFoundError("National Archives and Records Administration audit reports")
@@ -40,7 +39,7 @@ def run(options):
         inspector.save_report(report)
 
   # Pull the semiannual reports
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.parse_html(utils.download(SEMIANNUAL_REPORTS_URL))
   results = doc.select("div#content li")
   if not results:
     raise inspector.NoReportsFoundError("National Archives and Records Administration semiannual reports")
@@ -50,7 +49,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the Peer Review
-  doc = BeautifulSoup(utils.download(PEER_REVIEWS_URL))
+  doc = utils.parse_html(utils.download(PEER_REVIEWS_URL))
   result = doc.find("div", id='content').find("a", text=True)
   report = peer_review_from(result, year_range)
   if report:
@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.cncsoig.gov
@@ -15,6 +14,9 @@ archive = 1995
 # options:
 #   standard since/year options for a year range to fetch from.
 #
+#   skip_landing: reuse audit reports that have already been saved, instead of
+#      visiting their landing pages.
+#
 
 REPORTS_URLS = [
   ('http://www.cncsoig.gov/news/semi-annual-reports', 'semiannual_report'),
@@ -47,7 +49,7 @@ def run(options):
     last_page = options.get("end") # reset for each area
     while True:
       url = url_for(reports_page, page)
-      doc = BeautifulSoup(utils.download(url))
+      doc = utils.parse_html(utils.download(url))
 
       if last_page is None:
         last_page = last_page_from(doc)
@@ -104,6 +106,10 @@ def report_from(result, reports_page, report_type, year_range):
     if landing_url == "http://www.cncsoig.gov/news-entry/97-09-0":
       return
 
+    cached = inspector.cached_report('cncs', landing_url)
+    if cached:
+      return cached
+
     # PDF URL and summary are on the report's landing page
     report_url, summary, title = extract_from_release_page(landing_url)
     if not report_url:
@@ -224,7 +230,7 @@ def do_peer_review():
 
 # gets URL and summary from a report's landing page
 def extract_from_release_page(landing_url):
-  doc = BeautifulSoup(utils.download(landing_url))
+  doc = utils.parse_html(utils.download(landing_url))
   main = doc.select("#main #lefSide")[0]
 
   url_elem = main.select("div")[2].select("a")
@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.oig.doc.gov/Pages/Audits-Evaluations.aspx?YearStart=01/01/1996&YearEnd=12/31/2014
@@ -182,6 +181,6 @@ def report_from(result, topic, topic_url, year_range):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.parse_html(body)
 
 utils.run(run) if (__name__ == "__main__") else None
@@ -5,7 +5,6 @@ import re
 import logging
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.cpb.org/oig/
@@ -44,7 +43,7 @@ def run(options):
 
   # Pull the reports
   for report_type, url in REPORT_TYPE_MAP.items():
-    doc = BeautifulSoup(utils.download(url))
+    doc = utils.parse_html(utils.download(url))
     results = doc.select("div#content div#contentMain ul li.pdf")
     if not results:
       raise inspector.NoReportsFoundError("CPB (%s)" % url)
@@ -6,8 +6,8 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup, Tag
-from utils import utils, inspector
+from bs4 import Tag
+from utils import utils, inspector, segment
 
 # http://www.oig.denali.gov/
 archive = 2006
@@ -32,7 +32,7 @@ DATE_RE = re.compile("(20[0-9][0-9]\\.[01][0-9])(?: *- *(.*))?")
 def run(options):
   year_range = inspector.year_range(options, archive)
 
-  doc = BeautifulSoup(utils.download(REPORTS_URL))
+  doc = utils.parse_html(utils.download(REPORTS_URL))
 
   results = None
   for section in doc.find_all("section"):
@@ -42,23 +42,23 @@ def run(options):
 
   if not results:
     raise inspector.NoReportsFoundError("Denali Commission")
+  headers = segment.last_before(doc, results, is_header)
   for result in results:
-    report = report_from(result, year_range)
+    report = report_from(result, headers[id(result)], year_range)
     if report:
       inspector.save_report(report)
 
-def report_from(result, year_range):
-  # walk backwards through the doc to find the header title
-  for element in result.previous_elements:
-    if element and \
-        isinstance(element, Tag) and \
-        element.name == "span" and \
-        element.has_attr("class") and \
-        "collapseomatic" in element["class"]:
-      header = element.text.strip().lower()
-      break
-  else:
+def is_header(element):
+  return isinstance(element, Tag) and \
+    element.name == "span" and \
+    element.has_attr("class") and \
+    "collapseomatic" in element["class"]
+
+# header: the header the report is listed under, the last one before it
+def report_from(result, header, year_range):
+  if header is None:
     raise Exception("Couldn't find the header for %s" % result)
+  header = header.text.strip().lower()
 
   if header.startswith("inspection"):
     category = "inspection"
@@ -3,10 +3,9 @@
 import datetime
 from urllib.parse import urljoin, urlencode
 import re
-import os
 import logging
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from bs4 import SoupStrainer
+from utils import utils, inspector, pagination
 
 # http://www.dodig.mil/pubs/index.cfm
 archive = 1986
@@ -17,8 +16,9 @@ archive = 1986
 #
 #   report_id: limit to a particular report ID, skip others.
 #
-#   skip_downloaded: skip over any reports whose PDFs have been downloaded.
-#      useful for resuming large fetches without making needless HTTP requests.
+#   skip_landing: reuse reports that have already been saved, instead of
+#      visiting their landing pages. useful for resuming large fetches without
+#      making needless HTTP requests. (skip_downloaded also works.)
 #
 #   topics - limit reports fetched to one or more office, comma-separated.
 #            e.g. "IE,ISPA". These are the offices/"components" defined by the
@@ -46,6 +46,10 @@ OFFICES = {
 }
 BASE_URL = 'http://www.dodig.mil/pubs/index.cfm'
 
+# the parts of a results page that are used: the reports table, and the links
+# in the pager
+RESULTS_PAGE = SoupStrainer(["table", "a"])
+
 # TODO: report these to DOD as apparently missing
 BLACKLIST = ('D-2004-006', 'D-2002-119', 'D-2002-088', 'D-2002-072', 'D-2002-058', 'D-2002-046', 'D-2002-015', 'D-2001-166')
 
@@ -144,11 +148,8 @@ def run(options):
     # Default to all offices, whee!
     only = list(OFFICES.keys())
 
-  for url in urls_for(options, only):
-    body = utils.download(url)
-    page = BeautifulSoup(body)
-
-    report_table = page.select('table[summary~="reports"]')[0]
+  for page in pages_for(options, only):
+    report_table = page.doc.select('table[summary~="reports"]')[0]
     for tr in report_table.select('tr')[1:]:
       tds = tr.select('td')
       if len(tds) == 1:
@@ -190,18 +191,11 @@ def report_from(tds, options):
   if only_id and (only_id != report_id):
     return
 
-  # helper: use --skip_downloaded to skip reports whose PDFs are on disk
+  # helper: use --skip_landing to reuse reports that were already saved
   #   (drastically reduces calls to DOD landing pages)
-  if options.get('skip_downloaded'):
-    pdf_path = inspector.path_for({
-      'report_id': report_id,
-      'year': str(published_date.year),
-      'inspector': 'dod'
-    }, 'pdf')
-
-    if os.path.exists(os.path.join(utils.data_dir(), pdf_path)):
-      logging.warn("\tSkipping previously downloaded report, as asked.")
-      return
+  cached = inspector.cached_report('dod', landing_url)
+  if cached:
+    return cached
 
   report_url, summary, maybe_unreleased, skip = fetch_from_landing_page(landing_url)
 
@@ -251,7 +245,7 @@ def fetch_from_landing_page(landing_url):
   skip = False
 
   body = utils.download(landing_url)
-  page = BeautifulSoup(body)
+  page = utils.parse_html(body)
 
   report_tables = page.select('table[summary~="reports"]')
   # in the rare case that doesn't work, have faith
@@ -319,7 +313,7 @@ def fetch_from_landing_page(landing_url):
 
   return (href, summary, maybe_unreleased, skip)
 
-def urls_for(options, only):
+def pages_for(options, only):
   year_range = inspector.year_range(options, archive)
   for office in only:
     # there's always a first year, and it defaults to current year
@@ -332,30 +326,41 @@ def urls_for(options, only):
 
     query_string = urlencode(params)
     url = '{0}?{1}'.format(BASE_URL, query_string)
-    yield url
-
-    body = utils.download(url)
-    page = BeautifulSoup(body)
-
-    for url in get_pagination_urls(page):
-      yield url
-
-def get_pagination_urls(page):
-  """Find the pagination links on the page and yield them all.
-
-  This method recursively downloads new pages in the case that there are more
-  than 10.
+    for page in pagination.next_link(url, next_page_url, empty=no_reports, name="dod", parse=parse_results_page):
+      yield page
+
+def parse_results_page(body):
+  return utils.parse_html(body, only=RESULTS_PAGE)
+
+# a results page past the last one has a "No Data" row, or no rows at all
+def no_reports(page):
+  tables = page.doc.select('table[summary~="reports"]')
+  if not tables:
+    return True
+  rows = tables[0].select('tr')[1:]
+  return (not rows) or len(rows[0].select('td')) == 1
+
+def next_page_url(page):
+  """Find the link to the page after this one.
+
+  The pager links to the next ten pages by number, and then to the ten after
+  those with a "Next 10 Pages" link. The next page is the lowest numbered
+  link after this page (the walk's pages are numbered from 0, the pager's
+  from 1), and only when there's none is "Next 10 Pages" followed. The walk
+  ends on a page with neither, or on a page with no reports.
   """
-  for link in page.select('a'):
-    if 'href' not in link:
-      continue
-    if link['href'].startswith('?') and RE_DIGITS.match(link.text):
-      yield BASE_URL + link['href']
-    elif link['href'].startswith('/pubs') and RE_NEXT_10.search(link.text):
-      new_url = urljoin(BASE_URL, link['href'])
-      page = BeautifulSoup(utils.download(new_url))
-      for link in get_pagination_urls(page):
-        yield link
-
+  numbered = {}
+  for link in page.doc.select('a'):
+    href = link.get('href')
+    if href and href.startswith('?') and RE_DIGITS.match(link.text.strip()):
+      numbered[int(link.text.strip())] = BASE_URL + href
+  later = [number for number in numbered if number > page.number + 1]
+  if later:
+    return numbered[min(later)]
+  for link in page.doc.select('a'):
+    href = link.get('href')
+    if href and href.startswith('/pubs') and RE_NEXT_10.search(link.text):
+      return urljoin(BASE_URL, href)
+  return None
 
 utils.run(run) if (__name__ == "__main__") else None
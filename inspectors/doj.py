@@ -15,7 +15,6 @@ archive = 1994
 #               will be used to filter to a particular landing page.
 
 import re
-from bs4 import BeautifulSoup
 from datetime import datetime
 from utils import utils, inspector
 import logging
@@ -489,7 +488,7 @@ def type_for(original_type):
 
 def get_content(url):
   page = utils.download(url)
-  page = BeautifulSoup(page)
+  page = utils.parse_html(page)
   content = page.select(".content-left")
   if not content:
     raise inspector.NoReportsFoundError("DOJ (%s)" % url)
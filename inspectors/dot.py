@@ -4,7 +4,6 @@ import datetime
 from urllib.parse import urljoin
 import os
 import logging
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # https://www.oig.dot.gov/
@@ -79,7 +78,7 @@ def run(options):
       logging.debug("Scraping %s" % year_url)
       body = utils.download(year_url)
 
-      doc = BeautifulSoup(body)
+      doc = utils.parse_html(body)
 
       if not doc.select(".view-business-areas"):
         raise inspector.NoReportsFoundError("DOT (%s)" % topic)
@@ -128,7 +127,7 @@ def report_from(result, year_range, topic, options):
   logging.debug("### Processing report %s" % landing_url)
 
   report_page_body = utils.download(landing_url)
-  report_page = BeautifulSoup(report_page_body)
+  report_page = utils.parse_html(report_page_body)
 
   # take an expansive view of the 'summary' -
   #   landing page title, and any paragraphs with summary text
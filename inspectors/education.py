@@ -6,8 +6,7 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from utils import utils, inspector, parallel, dates
 
 # https://www2.ed.gov/about/offices/list/oig/areports.html
 archive = 1995
@@ -60,15 +59,8 @@ def run(options):
   report_id = options.get("report_id")
 
   # Get the audit reports
-  pre_1998_audit_flag = False
-  for year in year_range:
-    if year <= 1998:
-      if pre_1998_audit_flag:
-        continue
-      else:
-        pre_1998_audit_flag = True
-    url = audit_url_for(year)
-    doc = beautifulsoup_from_url(url)
+  # (every year up to 1998 is on the same page, which is only fetched once)
+  for year, url, doc in parallel.download_by_year(audit_url_for, year_range):
     agency_tables = doc.find_all("table", {"border": 1})
     if not agency_tables:
       raise inspector.NoReportsFoundException("Department of Education (%d audit reports)" % year)
@@ -117,6 +109,8 @@ def run(options):
 
 audit_reports_seen = set()
 
+PUBLISHED_DATES = dates.Parser('%m/%d/%Y', '%m/%d/%y', '%m/%Y')
+
 def audit_report_from(result, page_url, year_range):
   if not result.text.strip():
     # Just an empty row
@@ -150,13 +144,7 @@ def audit_report_from(result, page_url, year_range):
   else:
     # See notes to the IG Web team for some of this
     published_on_text = result.select("td")[2].text.strip().replace(")", "").replace("//", "/")
-    date_formats = ['%m/%d/%Y', '%m/%d/%y', '%m/%Y']
-    published_on = None
-    for date_format in date_formats:
-      try:
-        published_on = datetime.datetime.strptime(published_on_text, date_format)
-      except ValueError:
-        pass
+    published_on = PUBLISHED_DATES.parse(published_on_text)
 
   # The following report is linked to twice from the IG's website, once with
   # the date 02/06/2003 (correct) and once with the date 02/06/2002. Both links
@@ -300,7 +288,7 @@ def report_from(result, url, report_type, year_range):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.parse_html(body)
 
 
 utils.run(run) if (__name__ == "__main__") else None
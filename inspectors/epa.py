@@ -4,7 +4,6 @@ import datetime
 from urllib.parse import urljoin
 import re
 import os.path
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 archive = 1996
@@ -62,7 +61,7 @@ def run(options):
   index_body = utils.download(BASE_URL)
 
   current_year = None
-  index = BeautifulSoup(index_body)
+  index = utils.parse_html(index_body)
   tables = index.select('table.style1')
   if not tables:
     raise inspector.NoReportsFoundException("EPA")
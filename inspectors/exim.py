@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 
-from utils import utils, inspector
-from bs4 import BeautifulSoup
+from utils import utils, inspector, fingerprint, segment, dates
 from bs4.element import Tag, NavigableString
 from datetime import datetime
 import os.path
@@ -12,21 +11,33 @@ archive = 2007
 def run(options):
   year_range = inspector.year_range(options, archive)
 
+  # The pages depend on each other (links are deduplicated across all of
+  # them, and undated links take the last date seen), so they're only
+  # skipped together, when none of them has changed since the last run.
+  page_urls = [WHATS_NEW_URL, WHATS_NEW_ARCHIVE_URL, SEMIANNUAL_REPORTS_AND_TESTIMONIES_URL,
+               PRESS_RELEASES_URL, PRESS_RELEASES_ARCHIVE_URL]
+  bodies = {page_url: utils.download(page_url) for page_url in page_urls}
+  listing = fingerprint.Listing(WHATS_NEW_URL, [bodies[page_url] for page_url in page_urls])
+  if listing.unchanged:
+    return
+
   published_on = None
   for page_url in [WHATS_NEW_URL, WHATS_NEW_ARCHIVE_URL, SEMIANNUAL_REPORTS_AND_TESTIMONIES_URL]:
-    body = utils.download(page_url)
-    doc = BeautifulSoup(body)
+    body = bodies[page_url]
+    doc = utils.parse_html(body)
 
     maincontent = doc.select("div#CS_Element_eximpagemaincontent")[0]
-    all_a = maincontent.find_all("a")
-    if not all_a:
+    all_links = list(segment.links(maincontent))
+    if not all_links:
       raise inspector.NoReportsFoundException("Ex-Im Bank (%s)" % page_url)
-    for a in all_a:
-      a_text = str(a.text)
+    links_in_paragraphs = {}
+    for link in all_links:
+      a = link.tag
+      a_text = str(link.text)
       if a_text.strip() == "":
         continue
 
-      a_href = a.get("href")
+      a_href = link.href
       if a_href.startswith("mailto:"):
         continue
       if a_href.startswith("https://public.govdelivery.com/"):
@@ -40,31 +51,21 @@ def run(options):
 
       # Now, we want to grab all of the text associated with this link.
       # If there is just one link inside of a paragraph tag, we can take the
-      # text contents of that paragraph tag. Otherwise, we use "previous" to
-      # grab all the text that comes before the link.
+      # text contents of that paragraph tag. Otherwise, we take all the text
+      # that comes between the previous link and this one.
 
       parent_p = a
       while parent_p.name != "p":
         parent_p = parent_p.parent
-      links_in_parent = parent_p.find_all("a")
-      links_in_parent = [link for link in links_in_parent \
-                                if len(link.text.strip())]
-      links_in_parent = set([link.get("href") for link in links_in_parent])
-      if len(links_in_parent) == 1:
+      if id(parent_p) not in links_in_paragraphs:
+        links_in_parent = parent_p.find_all("a")
+        links_in_parent = [link for link in links_in_parent \
+                                  if len(link.text.strip())]
+        links_in_paragraphs[id(parent_p)] = set([link.get("href") for link in links_in_parent])
+      if len(links_in_paragraphs[id(parent_p)]) == 1:
         all_text = parent_p.text
       else:
-        all_text = a_text
-        node = a.previous
-        while True:
-          if is_inside_link(node):
-            break
-          if isinstance(node, NavigableString):
-            all_text = node + all_text
-          node = node.previous
-          if not node:
-            break
-          if node == maincontent:
-            break
+        all_text = link.preceding + a_text
 
       # Response letters don't get their own date heading -- keep date from
       # last report and reuse in those cases
@@ -76,11 +77,7 @@ def run(options):
           a_text = a_text.strip() + ' ' + temp.group(0) + ' - '
           temp = DATE_RE.search(all_text, temp.end() + 1)
           a_text = a_text + temp.group(0)
-        date_text = temp.group(0).replace('Sept ', 'Sep ')
-        try:
-          published_on = datetime.strptime(date_text, '%B %d, %Y')
-        except ValueError:
-          published_on = datetime.strptime(date_text, '%b %d, %Y')
+        published_on = parse_date(temp.group(0))
       if (published_on is None) or (published_on.year not in year_range):
         continue
 
@@ -89,8 +86,8 @@ def run(options):
 
   for page_url in [PRESS_RELEASES_URL, PRESS_RELEASES_ARCHIVE_URL]:
     done = False
-    body = utils.download(page_url)
-    doc = BeautifulSoup(body)
+    body = bodies[page_url]
+    doc = utils.parse_html(body)
 
     maincontent = doc.select("div#CS_Element_eximpagemaincontent")[0]
     all_p = maincontent.find_all("p")
@@ -115,11 +112,7 @@ def run(options):
           continue
 
         date_match = DATE_RE.search(all_text)
-        try:
-          date_text = date_match.group(0).replace('Sept ', 'Sep ')
-          published_on = datetime.strptime(date_text, '%B %d, %Y')
-        except ValueError:
-          published_on = datetime.strptime(date_text, '%b %d, %Y')
+        published_on = parse_date(date_match.group(0))
         if published_on.year not in year_range:
           continue
 
@@ -127,6 +120,14 @@ def run(options):
         inspector.save_report(report)
       if done: break
 
+  listing.done()
+
+def parse_date(date_text):
+  published_on = DATES.parse(date_text)
+  if published_on is None:
+    raise ValueError("Unable to parse date %s" % date_text)
+  return published_on
+
 def report_from(all_text, link_text, link_url, page_url, published_on):
   report = {
     'inspector': 'exim',
@@ -280,14 +281,6 @@ def recurse_tree(root, inside_link):
         accumulator[1] = accumulator[1] + str(child)
   yield tuple(accumulator)
 
-def is_inside_link(node):
-  x = node
-  while x != None:
-    if x.name == "a":
-      return True
-    x = x.parent
-  return False
-
 _url_dedup_set = set()
 def deduplicate_url(url):
   '''Records all URLs passed. If a URL has been seen before, return True,
@@ -363,6 +356,8 @@ DATE_RE = re.compile("(January|February|March|April|May|June|July|August|" +
                     "\\s+([123]?[0-9]),\\s+" +
                     "(20[0-9][0-9])")
 
+DATES = dates.Parser('%B %d, %Y', '%b %d, %Y')
+
 IDENTIFIER_RE_TEXT = re.compile("""\((OIG-[A-Z][A-Z]-[0-9][0-9]-[0-9][0-9])\)""")
 IDENTIFIER_RE_URL = re.compile("""(OIG-[A-Z][A-Z]-[0-9][0-9]-[0-9][0-9])""")
 
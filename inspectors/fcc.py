@@ -5,8 +5,7 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from utils import utils, inspector, dates
 
 # http://transition.fcc.gov/oig/oigreportsaudit.html
 archive = 1994
@@ -42,6 +41,8 @@ def run(options):
       if report:
         inspector.save_report(report)
 
+DATES = dates.Parser('%m/%d/%y', '%m/%d/%Y')
+
 def report_from(result, page_url, report_type, year_range):
   if not result.text.strip():
     # Nothing in the entire row, just an empty row
@@ -59,10 +60,9 @@ def report_from(result, page_url, report_type, year_range):
     published_on = datetime.datetime.strptime(published_on_text, '%B %d, %Y')
     title = "Semi-Annual Report - {}".format(published_on_text)
   else:
-    try:
-      published_on = datetime.datetime.strptime(published_on_text, '%m/%d/%y')
-    except ValueError:
-      published_on = datetime.datetime.strptime(published_on_text, '%m/%d/%Y')
+    published_on = DATES.parse(published_on_text)
+    if published_on is None:
+      raise ValueError("Unable to parse date %s" % published_on_text)
     title = result.select("td")[1].text.strip()
 
   if published_on.year not in year_range:
@@ -85,7 +85,7 @@ def report_from(result, page_url, report_type, year_range):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.parse_html(body)
 
 
 utils.run(run) if (__name__ == "__main__") else None
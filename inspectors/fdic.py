@@ -5,8 +5,8 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from bs4 import SoupStrainer
+from utils import utils, inspector, fingerprint
 
 # http://www.fdicoig.gov
 archive = 1998
@@ -28,11 +28,19 @@ REPORTS_URL = "http://www.fdicoig.gov/Search-Engine.asp"
 # Reports with this URL should be designated as missing
 GENERIC_MISSING_REPORT_URL = 'http://www.fdicoig.gov/notice.pdf'
 
+# the only part of the search results page that's used
+RESULTS_TABLE = SoupStrainer("table", attrs={"cellpadding": "5"})
+
 def run(options):
   year_range = inspector.year_range(options, archive)
 
-  # Pull the reports
-  doc = BeautifulSoup(utils.download(REPORTS_URL))
+  # Pull the reports, unless the list hasn't changed since the last run
+  body = utils.download(REPORTS_URL)
+  listing = fingerprint.Listing(REPORTS_URL, body)
+  if listing.unchanged:
+    return
+
+  doc = utils.parse_html(body, only=RESULTS_TABLE)
   results = doc.find("table", {"cellpadding": "5"}).select("tr")
   if not results:
     raise inspector.NoReportsFoundError("FDIC")
@@ -43,6 +51,7 @@ def run(options):
     report = report_from(result, year_range)
     if report:
       inspector.save_report(report)
+  listing.done()
 
 def type_for_report(text):
   if text == 'audit report':
@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://oig.federalreserve.gov/reports/allyearsboardcfpb.htm
@@ -177,7 +176,7 @@ def semiannual_report_from(report_url, year_range):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.parse_html(body)
 
 
 utils.run(run) if (__name__ == "__main__") else None
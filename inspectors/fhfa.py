@@ -4,7 +4,6 @@ import datetime
 import logging
 import os
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://fhfaoig.gov/
@@ -39,7 +38,7 @@ def run(options):
 
   # Pull the audit reports. Pages are 0-indexed.
   for page in range(0, int(pages) - 1):
-    doc = BeautifulSoup(utils.download(AUDIT_REPORTS_URL.format(page=page)))
+    doc = utils.parse_html(utils.download(AUDIT_REPORTS_URL.format(page=page)))
     results = doc.select("span.field-content")
     if not results:
       if page == 0:
@@ -55,7 +54,7 @@ def run(options):
 
   # Grab the other reports
   for report_type, url in OTHER_REPORT_URLS.items():
-    doc = BeautifulSoup(utils.download(url))
+    doc = utils.parse_html(utils.download(url))
     results = doc.select(".views-field")
     if not results:
       results = doc.select(".views-row")
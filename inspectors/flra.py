@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # https://www.flra.gov/OIG
@@ -36,7 +35,7 @@ def run(options):
 
   # Pull the reports
   for report_type, url in REPORT_URLS.items():
-    doc = BeautifulSoup(utils.download(url))
+    doc = utils.parse_html(utils.download(url))
     results = doc.select("div.node ul li")
     if not results:
       raise inspector.NoReportsFoundError("Federal Labor Relations Authority (%s)" % report_type)
@@ -7,8 +7,8 @@ import os
 import re
 from urllib.parse import urljoin, urlparse, urlunparse, urldefrag
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from bs4 import SoupStrainer
+from utils import utils, inspector, dedupe, headers, segment, dates
 
 # http://oig.hhs.gov/reports-and-publications/index.asp
 archive = 1985
@@ -37,6 +37,11 @@ archive = 1985
 #            B    - OIG Budget
 #            RAOR - Recovery Act Oversight Reports
 #            RAA  - Recovery Act-related Audit and Inspection Reports
+#
+#   resume - after an interrupted run, skip topics that were completed.
+#
+#   skip_landing - reuse reports that have already been saved, instead of
+#                  visiting their landing pages.
 
 # Notes for IG's web team:
 #  - A large number of reports don't list a date when they were published.
@@ -259,6 +264,12 @@ TITLE_NORMALIZATION = {
 
 BASE_URL = "http://oig.hhs.gov"
 
+# the listings (topic, subtopic and OEI letter pages) only use the page's
+# main content
+INDEX_PAGE = SoupStrainer(id="leftContentInterior")
+
+META_REFRESH_RE = re.compile(r"http-equiv\s*=\s*[\"']?refresh", re.I)
+
 def run(options):
   year_range = inspector.year_range(options, archive)
 
@@ -269,32 +280,51 @@ def run(options):
     topics = list(TOPIC_TO_URL.keys())
     topics.sort()
 
-  for topic in topics:
-    extract_reports_for_topic(topic, year_range)
-    if topic in TOPIC_TO_ARCHIVE_URL:
-      extract_reports_for_topic(topic, year_range, archives=True)
+  # bring cached Last-Modified headers of reports from the requested years up
+  # to date in one concurrent batch, instead of one request at a time as
+  # reports come up
+  headers.refresh(BASE_URL, years=year_range)
 
-  deduplicate_finalize()
+  # reports are often listed under several topics, merge them together
+  merger = dedupe.ReportMerger("hhs", deduplicate_key, deduplicate_merge)
 
-def extract_reports_for_topic(topic, year_range, archives=False):
-  if topic == "OE":
-    extract_reports_for_oei(year_range)
+  try:
+    for topic in topics:
+      extract_reports_for_topic(topic, year_range, merger)
+      if topic in TOPIC_TO_ARCHIVE_URL:
+        extract_reports_for_topic(topic, year_range, merger, archives=True)
+  finally:
+    # if the run stops early (e.g. at its budget), reports merged so far
+    # still get their merged data written
+    merger.write_merged()
+
+  merger.finalize()
+
+def extract_reports_for_topic(topic, year_range, merger, archives=False):
+  stage = "%s (archives)" % topic if archives else topic
+  if merger.stage_done(stage):
+    logging.warn("## Skipping %s, already completed" % stage)
     return
 
-  topic_url = TOPIC_TO_ARCHIVE_URL[topic] if archives else TOPIC_TO_URL[topic]
-
-  if topic in TOPIC_WITH_SUBTOPICS:
-    subtopic_map = get_subtopic_map(topic_url)
+  if topic == "OE":
+    extract_reports_for_oei(year_range, merger)
   else:
-    subtopic_map = {None: topic_url}
+    topic_url = TOPIC_TO_ARCHIVE_URL[topic] if archives else TOPIC_TO_URL[topic]
+
+    if topic in TOPIC_WITH_SUBTOPICS:
+      subtopic_map = get_subtopic_map(topic_url)
+    else:
+      subtopic_map = {None: topic_url}
+
+    topic_name = TOPIC_NAMES[topic]
+    for subtopic_name, subtopic_url in subtopic_map.items():
+      logging.debug("## Processing subtopic %s" % subtopic_name)
+      extract_reports_for_subtopic(subtopic_url, year_range, topic_name, subtopic_name, merger)
 
-  topic_name = TOPIC_NAMES[topic]
-  for subtopic_name, subtopic_url in subtopic_map.items():
-    logging.debug("## Processing subtopic %s" % subtopic_name)
-    extract_reports_for_subtopic(subtopic_url, year_range, topic_name, subtopic_name)
+  merger.stage_complete(stage)
 
-def extract_reports_for_subtopic(subtopic_url, year_range, topic_name, subtopic_name):
-  doc = beautifulsoup_from_url(subtopic_url)
+def extract_reports_for_subtopic(subtopic_url, year_range, topic_name, subtopic_name, merger):
+  doc = beautifulsoup_from_url(subtopic_url, INDEX_PAGE)
   if not doc:
     raise Exception("Failure fetching subtopic URL: %s" % subtopic_url)
 
@@ -318,12 +348,12 @@ def extract_reports_for_subtopic(subtopic_url, year_range, topic_name, subtopic_
       continue
     report = report_from(result, year_range, topic_name, subtopic_url, subtopic_name)
     if report:
-      deduplicate_save_report(report)
+      merger.add(report)
 
-def extract_reports_for_oei(year_range):
+def extract_reports_for_oei(year_range, merger):
   topic_name = TOPIC_NAMES["OE"]
   topic_url = TOPIC_TO_URL["OE"]
-  root_doc = beautifulsoup_from_url(topic_url)
+  root_doc = beautifulsoup_from_url(topic_url, INDEX_PAGE)
 
   letter_urls = set()
   for link in root_doc.select("#leftContentInterior li a"):
@@ -337,21 +367,21 @@ def extract_reports_for_oei(year_range):
   all_results_links = {}
   all_results_unreleased = []
   for letter_url in letter_urls:
-    letter_doc = beautifulsoup_from_url(letter_url)
+    letter_doc = beautifulsoup_from_url(letter_url, INDEX_PAGE)
 
     results = letter_doc.select("#leftContentInterior ul li")
     if not results:
       raise inspector.NoReportsFoundError("HHS (OEI %s)" % letter_url)
+    subtopic_headings = segment.last_before(letter_doc, results,
+                                            lambda element: element.name == "h2")
     for result in results:
       if 'crossref' in result.parent.parent.attrs.get('class', []):
         continue
       if result.parent.parent.attrs.get('id') == 'related':
         continue
 
-      node = result
-      while node and node.name != "h2":
-        node = node.previous
-      if node and node.name == "h2":
+      node = subtopic_headings[id(result)]
+      if node:
         subtopic_name = str(node.text)
       else:
         subtopic_name = "(unknown)"
@@ -398,7 +428,7 @@ def extract_reports_for_oei(year_range):
   for result, subtopic_name in itertools.chain(all_results_links.values(), all_results_unreleased):
     report = report_from(result, year_range, topic_name, subtopic_url, subtopic_name)
     if report:
-      deduplicate_save_report(report)
+      merger.add(report)
 
 def report_from(result, year_range, topic, subtopic_url, subtopic=None):
   # Ignore links to other subsections
@@ -469,12 +499,19 @@ def report_from(result, year_range, topic, subtopic_url, subtopic=None):
       and published_on.date == 12 and report_id == "20901002":
     return
 
+  landing_url = None
   if report_id in REPORT_PUBLISHED_MAPPING:
     published_on = REPORT_PUBLISHED_MAPPING[report_id]
   else:
     # Process reports with landing pages
     if extension.lower() != '.pdf':
-      report_url, published_on = report_from_landing_url(report_url)
+      landing_url = report_url
+      cached = inspector.cached_report('hhs', landing_url)
+      if cached:
+        report_url = cached['url']
+        published_on = datetime.datetime.strptime(cached['published_on'], "%Y-%m-%d")
+      else:
+        report_url, published_on = report_from_landing_url(landing_url)
     else:
       published_on = published_on_from_inline_link(
         result,
@@ -500,6 +537,8 @@ def report_from(result, year_range, topic, subtopic_url, subtopic=None):
     'title': title,
     'published_on': datetime.datetime.strftime(published_on, "%Y-%m-%d"),
   }
+  if landing_url:
+    result['landing_url'] = landing_url
   if subtopic:
     result['subtopic'] = subtopic
   return result
@@ -553,6 +592,15 @@ def report_from_landing_url(report_url):
 def clean_published_text(published_text):
   return published_text.strip().replace(" ", "").replace("\xa0", "")
 
+PUBLISHED_DATES = dates.Parser(
+  '%m-%d-%Y',
+  '%m-%d-%y',
+  '%b%d,%Y',
+  '%B%d,%Y',
+  '%B,%d,%Y',
+  '%B%Y',
+)
+
 def get_published_date_from_tag(possible_tag):
   try:
     published_on_text = possible_tag.contents[0].split("|")[0]
@@ -561,26 +609,15 @@ def get_published_date_from_tag(possible_tag):
 
   published_on_text = clean_published_text(published_on_text)
 
-  date_formats = [
-    '%m-%d-%Y',
-    '%m-%d-%y',
-    '%b%d,%Y',
-    '%B%d,%Y',
-    '%B,%d,%Y',
-    '%B%Y',
-  ]
-  for date_format in date_formats:
-    try:
-      return datetime.datetime.strptime(published_on_text, date_format)
-    except ValueError:
-      pass
+  published_on = PUBLISHED_DATES.parse(published_on_text)
+  if published_on:
+    return published_on
 
-  for date_format in date_formats:
-    try:
-      published_text = clean_published_text(possible_tag.contents[-1])
-      return datetime.datetime.strptime(published_text, date_format)
-    except (ValueError, TypeError, IndexError):
-      pass
+  try:
+    published_text = clean_published_text(possible_tag.contents[-1])
+  except (TypeError, IndexError):
+    return None
+  return PUBLISHED_DATES.parse(published_text)
 
 def published_on_from_inline_link(result, report_filename, title, report_id, report_url):
   published_on = None
@@ -625,8 +662,9 @@ def published_on_from_inline_link(result, report_filename, title, report_id, rep
                 published_on = datetime.datetime(fiscal_year - 1, 10, 1)
               except ValueError:
                 # Try using the last-modified header
-                response = utils.scraper.request(method='HEAD', url=report_url)
-                last_modified = response.headers['Last-Modified']
+                last_modified = headers.lookup(report_url)['last_modified']
+                if not last_modified:
+                  raise Exception("No Last-Modified header for %s" % report_url)
                 published_on = datetime.datetime.strptime(last_modified, '%a, %d %b %Y %H:%M:%S %Z')
                 if published_on.year < 2003:
                   # We don't trust the last-modified for dates before 2003
@@ -644,7 +682,7 @@ def published_on_from_inline_link(result, report_filename, title, report_id, rep
   return published_on
 
 def get_subtopic_map(topic_url):
-  doc = beautifulsoup_from_url(topic_url)
+  doc = beautifulsoup_from_url(topic_url, INDEX_PAGE)
 
   subtopic_map = {}
   for link in doc.select("#leftContentInterior li a"):
@@ -663,16 +701,21 @@ def get_subtopic_map(topic_url):
 
   return subtopic_map
 
-def beautifulsoup_from_url(url):
+# only, if given, restricts the page to the parts a caller needs (see
+# utils.parse_html); pages that may be meta refreshes are parsed in full
+def beautifulsoup_from_url(url, only=None):
   body = utils.download(url)
   if body is None: return None
 
-  doc = BeautifulSoup(body)
+  if not META_REFRESH_RE.search(body):
+    return utils.parse_html(body, only)
+
+  doc = utils.parse_html(body)
 
   # Some of the pages will return meta refreshes
   if doc.find("meta") and doc.find("meta").attrs.get('http-equiv') == 'REFRESH':
     redirect_url = urljoin(url, doc.find("meta").attrs['content'].split("url=")[1])
-    return beautifulsoup_from_url(redirect_url)
+    return beautifulsoup_from_url(redirect_url, only)
   else:
     return doc
 
@@ -680,28 +723,17 @@ def strip_url_fragment(url):
   scheme, netloc, path, params, query, fragment = urlparse(url)
   return urlunparse((scheme, netloc, path, params, query, ""))
 
-_report_storage = {}
-def deduplicate_save_report(report):
-  global _report_storage
-  key = (report['title'], report['url'], report['published_on'])
-  if key in _report_storage:
-    if report['topic'] not in _report_storage[key]['topic']:
-      _report_storage[key]['topic'] = _report_storage[key]['topic'] + ", " + \
-          report['topic']
-    if report.get('subtopic'):
-      if _report_storage[key].get('subtopic'):
-        if report['subtopic'] not in _report_storage[key]['subtopic']:
-          _report_storage[key]['subtopic'] = _report_storage[key]['subtopic'] \
-              + ", " + report['subtopic']
-      else:
-        _report_storage[key]['subtopic'] = report['subtopic']
-  else:
-    _report_storage[key] = report
+def deduplicate_key(report):
+  return (report['title'], report['url'], report['published_on'])
 
-def deduplicate_finalize():
-  global _report_storage
-  for report in _report_storage.values():
-    inspector.save_report(report)
-  _report_storage = {}
+def deduplicate_merge(existing, report):
+  if report['topic'] not in existing['topic']:
+    existing['topic'] = existing['topic'] + ", " + report['topic']
+  if report.get('subtopic'):
+    if existing.get('subtopic'):
+      if report['subtopic'] not in existing['subtopic']:
+        existing['subtopic'] = existing['subtopic'] + ", " + report['subtopic']
+    else:
+      existing['subtopic'] = report['subtopic']
 
 utils.run(run) if (__name__ == "__main__") else None
@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.doi.gov/oig/reports/index.cfm
@@ -37,7 +36,7 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   response = utils.scraper.post(REPORT_SEARCH_URL, data=POST_DATA)
-  doc = BeautifulSoup(response.text)
+  doc = utils.parse_html(response.text)
 
   results = doc.select("div.report")
   if not results:
@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.oig.dol.gov/auditreports.htm
@@ -166,7 +165,7 @@ def url_for(year, page_number):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.parse_html(body)
 
 
 utils.run(run) if (__name__ == "__main__") else None
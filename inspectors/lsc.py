@@ -6,7 +6,7 @@ import os
 import re
 from urllib.parse import urljoin, unquote
 
-from bs4 import BeautifulSoup, Tag, NavigableString, Comment
+from bs4 import Tag, NavigableString, Comment
 from utils import utils, inspector
 
 # https://www.oig.lsc.gov
@@ -175,7 +175,7 @@ def run(options):
   # Pull the audit reports
   for url, report_type, parse_func in REPORT_PAGES_INFO:
     page_content = utils.download(url)
-    doc = BeautifulSoup(page_content)
+    doc = utils.parse_html(page_content)
 
     content = doc.select("section.article-content")[0]
     parse_func(content, url, report_type, year_range)
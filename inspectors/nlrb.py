@@ -6,7 +6,6 @@ import os
 import re
 import urllib
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # https://www.nlrb.gov/who-we-are/inspector-general
@@ -54,7 +53,7 @@ def run(options):
 
   # Pull the audit and inspections reports
   for report_type, reports_url in REPORT_URLS:
-    doc = BeautifulSoup(utils.download(reports_url))
+    doc = utils.parse_html(utils.download(reports_url))
     results = doc.select("div.field-item")
     if not results:
       raise inspector.NoReportsFoundError("National Labor Relations Board (%s)" % report_type)
@@ -64,7 +63,7 @@ def run(options):
         inspector.save_report(report)
 
   # Pull the semiannual reports
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.parse_html(utils.download(SEMIANNUAL_REPORTS_URL))
   results = doc.select("div.field-item")
   if not results:
     raise inspector.NoReportsFoundError("National Labor Relations Board (semiannual reports)")
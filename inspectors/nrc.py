@@ -6,8 +6,7 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from utils import utils, inspector, parallel
 
 # http://www.nrc.gov/insp-gen.html
 archive = 1995
@@ -50,9 +49,8 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   # Pull the audit reports
-  for year in year_range:
-    url = AUDITS_REPORTS_URL.format(year)
-    doc = BeautifulSoup(utils.download(url))
+  audit_pages = parallel.download_by_year(AUDITS_REPORTS_URL.format, year_range)
+  for year, url, doc in audit_pages:
     results = doc.find("table", border="1").select("tr")
     if not results:
       raise inspector.NoReportsFoundError("Nuclear Regulatory Commission (%d)" % year)
@@ -65,7 +63,7 @@ def run(options):
         inspector.save_report(report)
 
   # Pull the congressional testimony
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.parse_html(utils.download(SEMIANNUAL_REPORTS_URL))
   semiannual_reports_table = doc.find("table", border="1")
   results = semiannual_reports_table.select("tr")
   if not results:
@@ -80,7 +78,7 @@ def run(options):
 
   # Pull the other reports
   for reports_url, id_prefix in OTHER_REPORT_URLS:
-    doc = BeautifulSoup(utils.download(reports_url))
+    doc = utils.parse_html(utils.download(reports_url))
     results = doc.find("table", border="1").select("tr")
     if not results:
       raise inspector.NoReportsFoundError("Nuclear Regulatory Commission (other)")
@@ -156,7 +154,7 @@ def semiannual_report_from(result, year_range):
   report_link = result.find("a")
   landing_url = urljoin(SEMIANNUAL_REPORTS_URL, report_link.get('href'))
 
-  landing_page = BeautifulSoup(utils.download(landing_url))
+  landing_page = utils.parse_html(utils.download(landing_url))
   title = " ".join(landing_page.select("#mainSubFull h1")[0].text.split())
 
   try:
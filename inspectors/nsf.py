@@ -6,7 +6,6 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # https://www.nsf.gov/oig/
@@ -32,6 +31,8 @@ CASE_REPORTS_DATA = {
   'sortby': 'rpt_num',
   'sballfrm': 'Search',
 }
+# the case report search is a POST, whose response is cached for this long
+CASE_REPORTS_CACHE_TTL = 6 * 60 * 60
 
 REPORT_PUBLISHED_MAP = {
   "HSN_Summary": datetime.datetime(2013, 9, 30),  # Estimated
@@ -44,7 +45,7 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   # Pull the audit reports
-  doc = BeautifulSoup(utils.download(AUDIT_REPORTS_URL))
+  doc = utils.parse_html(utils.download(AUDIT_REPORTS_URL))
   results = doc.select("td.text table tr")
   if not results:
     raise inspector.NoReportsFoundError("National Science Foundation (audit reports")
@@ -57,7 +58,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the semiannual reports
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.parse_html(utils.download(SEMIANNUAL_REPORTS_URL))
   results = doc.select("td.text table tr")
   if not results:
     raise inspector.NoReportsFoundError("National Science Foundation (semiannual reports)")
@@ -69,11 +70,11 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the case reports
-  response = utils.scraper.post(
-    url=CASE_REPORTS_URL,
-    data=CASE_REPORTS_DATA,
-  )
-  doc = BeautifulSoup(response.content)
+  response = utils.post(CASE_REPORTS_URL, data=CASE_REPORTS_DATA,
+                        cache_ttl=CASE_REPORTS_CACHE_TTL)
+  if not response:
+    raise Exception("Failed to fetch the case reports from nsf.gov.")
+  doc = utils.parse_html(response.content)
   results = doc.select("td.text table tr")
   if not results:
     raise inspector.NoReportsFoundError("National Science Foundation (case reports)")
@@ -85,7 +86,7 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the testimony
-  doc = BeautifulSoup(utils.download(TESTIMONY_REPORTS_URL))
+  doc = utils.parse_html(utils.download(TESTIMONY_REPORTS_URL))
   results = doc.select("td.text table tr")
   if not results:
     raise inspector.NoReportsFoundError("National Science Foundation (testimony)")
@@ -191,7 +192,7 @@ def semiannual_report_from(result, year_range):
     landing_page_response = utils.scraper.get(landing_url)
     landing_url = landing_page_response.url
 
-    landing_page = BeautifulSoup(landing_page_response.content)
+    landing_page = utils.parse_html(landing_page_response.content)
     report_leadin_text = landing_page.find(text=REPORT_LEADIN_TEXT)
     report_link_text = landing_page.find(text=REPORT_LINK_TEXT)
     report_link = None
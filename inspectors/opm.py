@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 
 from utils import utils, inspector
-from bs4 import BeautifulSoup
 import bs4
 import os
 import logging
@@ -37,7 +36,7 @@ def run(options):
   url = url_for()
   body = utils.download(url)
 
-  doc = BeautifulSoup(body)
+  doc = utils.parse_html(body)
   results = doc.select("section")
   if not results:
     raise inspector.NoReportsFoundError("OPM")
@@ -5,7 +5,6 @@ import logging
 import os
 import urllib
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.peacecorps.gov/about/inspgen/
@@ -60,7 +59,7 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   # Pull the reports
-  doc = BeautifulSoup(utils.download(REPORTS_URL))
+  doc = utils.parse_html(utils.download(REPORTS_URL))
   results = doc.select("li div li")
   if not results:
     raise inspector.NoReportsFoundError("Peace Corps")
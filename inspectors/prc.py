@@ -3,7 +3,6 @@
 import datetime
 import logging
 import os
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 archive = 2007
@@ -20,13 +19,13 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   # Find the number of pages to iterate
-  doc = BeautifulSoup(utils.download(REPORTS_URL))
+  doc = utils.parse_html(utils.download(REPORTS_URL))
   page_count = int(doc.select("li.pager-last a")[0]['href'][-1:])
 
   # Iterate over those pages
   for page in range(0, page_count + 1):
     response = utils.download(REPORTS_URL + str(page))
-    doc = BeautifulSoup(response)
+    doc = utils.parse_html(response)
     results = doc.select(".reports")
     if not results:
       if page == 0:
@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.rrb.gov/oig/Default.asp
@@ -23,7 +22,7 @@ AUDIT_REPORTS_URL = "http://www.rrb.gov/oig/reports/FY{year}reports.asp"
 def run(options):
   year_range = inspector.year_range(options, archive)
 
-  doc = BeautifulSoup(utils.download(REPORTS_URL))
+  doc = utils.parse_html(utils.download(REPORTS_URL))
 
   # Pull the semiannual reports
   semiannul_results = doc.select("#AnnualManagementReports select")[0]
@@ -47,7 +46,7 @@ def run(options):
     if year < 2001:  # The oldest fiscal year page available
       continue
     year_url = AUDIT_REPORTS_URL.format(year=year)
-    doc = BeautifulSoup(utils.download(year_url))
+    doc = utils.parse_html(utils.download(year_url))
     results = doc.select("#main table tr")
     if not results:
       raise inspector.NoReportsFoundError("Railroad Retirement Board (%d)" % year)
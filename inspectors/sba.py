@@ -6,8 +6,7 @@ import os
 import re
 from urllib.parse import urljoin, urlparse, parse_qs
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from utils import utils, inspector, reconcile
 
 # https://www.sba.gov/office-of-inspector-general
 archive = 1994
@@ -17,6 +16,9 @@ archive = 1994
 #
 #   pages - number of pages to fetch. defaults to all of them (using a very high number)
 #
+#   max_extra_fetches - most requests to spend re-fetching pages of the
+#          unstable report list, defaults to 100
+#
 # Notes for IG's web team:
 # - Add the published date for all reports in `REPORT_PUBLISHED_MAPPING`.
 
@@ -48,11 +50,19 @@ DUPLICATE_LANDING_URLS = (
 )
 
 # The report list is not stable, so sometimes we need to fetch the same page of
-# results multiple times to get everything. This constant is the maximum
-# number of times we will do so.
+# results multiple times to get everything (see utils/reconcile.py). These
+# constants are the maximum number of times we will do so, and the most extra
+# requests we'll spend doing it. Every page but the last holds
+# REPORTS_PER_PAGE reports, so a page that gives fewer new ones than that
+# has lost some to another page, and is fetched again.
 MAX_RETRIES = 10
+MAX_EXTRA_FETCHES = 100
 REPORTS_PER_PAGE = 10
 
+# Pages of the report list are fetched with POSTs, which are cached for this
+# long, so a rerun soon after (e.g. after a crash) doesn't walk the list again
+LISTING_CACHE_TTL = 6 * 60 * 60
+
 def run(options):
   year_range = inspector.year_range(options, archive)
 
@@ -61,49 +71,29 @@ def run(options):
   if 'pages' in options:
     pages = min(pages, int(options['pages']))
 
-  rows_seen = set()
-  last_row_count = 0
-
-  for page in reversed(range(pages)):
-    for retry in range(MAX_RETRIES):
-      logging.warning('Fetching page %d, attempt %d' % (page, retry))
-      doc = beautifulsoup_from_page_index(page)
-
-      results = doc.select("tr")
-      if not results:
-        raise inspector.NoReportsFoundError("Small Business Admininstration")
-
-      for index, result in enumerate(results):
-        if not index:
-          # Skip the header row
-          continue
-
-        row_key = (str(result.text), result.a['href'])
-        if row_key not in rows_seen:
-          report = report_from(result, year_range)
-          if report:
-            inspector.save_report(report)
-          rows_seen.add(row_key)
-
-      if page == last_page_index:
-        # Since we're scraping the last page first, always fetch it only once.
-        # If we lose a report between the last page and the second to last page,
-        # we will see nine new reports on the second to last page, and then
-        # retry that one until we get the tenth.
-        break
-      elif len(rows_seen) == last_row_count + REPORTS_PER_PAGE:
-        # We saw as many new reports as we expected to, so we haven't missed
-        # any, and it's safe to move on to the next page
-        break
-      elif len(rows_seen) < last_row_count + REPORTS_PER_PAGE:
-        # We were expecting more new reports on this page, try again
-        continue
-      else:
-        raise AssertionError("Found %d new reports on page %d, too many!" % \
-            (len(rows_seen) - last_row_count, page))
-    last_row_count = len(rows_seen)
-
-def beautifulsoup_from_page_index(page):
+  reconciler = reconcile.ListingReconciler("sba",
+    url_for=lambda page: REPORTS_AJAX_URL,
+    fetch=html_from_page_index,
+    rows=results_from,
+    row_key=lambda result: (str(result.text), result.a['href']),
+    expected=lambda page, results: len(results) if page == last_page_index else REPORTS_PER_PAGE,
+    max_passes=MAX_RETRIES,
+    budget=int(options.get('max_extra_fetches', MAX_EXTRA_FETCHES)))
+
+  for result in reconciler.rows_from(range(pages)):
+    report = report_from(result, year_range)
+    if report:
+      inspector.save_report(report)
+
+def results_from(doc, page):
+  results = doc.select("tr")
+  if not results:
+    raise inspector.NoReportsFoundError("Small Business Admininstration")
+  # Skip the header row
+  return results[1:]
+
+# retries skip the cache, since the point is to see the list in a new order
+def html_from_page_index(page, retry=False):
   data = {
     'view_name': 'oig_nodes',
     'view_display_id': 'block_search_oig_reports',
@@ -112,15 +102,15 @@ def beautifulsoup_from_page_index(page):
 
   headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-  response = utils.post(REPORTS_AJAX_URL, data=data, headers=headers)
+  cache_ttl = None if retry else LISTING_CACHE_TTL
+  response = utils.post(REPORTS_AJAX_URL, data=data, headers=headers, cache_ttl=cache_ttl)
   if not response:
     raise Exception("Failed to fetch data from sba.gov.")
 
-  page_html = response.json()[1]['data']
-  return BeautifulSoup(page_html)
+  return response.json()[1]['data']
 
 def get_last_page_index():
-  doc = beautifulsoup_from_page_index(0)
+  doc = utils.parse_html(html_from_page_index(0))
   last_page_link = doc.find("a", title="Go to last page")
   href = last_page_link['href']
   query = urlparse(href).query
@@ -182,7 +172,7 @@ def report_from(result, year_range):
     logging.warn("Bad landing URL, downloaded None: %s" % landing_url)
     raise Exception("Couldn't download landing URL.")
 
-  landing_page = BeautifulSoup(landing_body)
+  landing_page = utils.parse_html(landing_body)
 
   try:
     report_url = urljoin(BASE_REPORT_URL, landing_page.select("#attachments a")[0].get('href'))
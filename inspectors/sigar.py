@@ -5,7 +5,6 @@ import logging
 import os
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # http://www.sigar.mil/
@@ -40,7 +39,7 @@ def run(options):
 
   # Pull the reports
   for report_type, report_url in REPORT_URLS.items():
-    doc = BeautifulSoup(utils.download(report_url))
+    doc = utils.parse_html(utils.download(report_url))
     results = doc.select("item")
     if not results:
       raise inspector.NoReportsFoundError("SIGAR (%s)" % report_type)
@@ -4,7 +4,6 @@ import datetime
 import logging
 import os
 
-from bs4 import BeautifulSoup
 from utils import utils, inspector
 
 # https://oig.state.gov/reports
@@ -53,7 +52,7 @@ def run(options):
 
 def extract_reports_for_page(url, page_number, year_range, listing_xpath):
   body = utils.download(url)
-  doc = BeautifulSoup(body)
+  doc = utils.parse_html(body)
   results = doc.select(listing_xpath)
 
   if not results and not page_number:
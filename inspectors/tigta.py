@@ -6,8 +6,7 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from utils import utils, inspector, parallel
 
 # http://www.treasury.gov/tigta/publications_semi.shtml
 archive = 1999
@@ -37,16 +36,15 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   # Pull the audit reports
-  for year in year_range:
-    url = audit_report_url(year)
-    if url:
-      parse_result_from_js_url(url, "auditreports", year, year_range, report_type='audit')
-    url = inspection_report_url(year)
-    if url:
-      parse_result_from_js_url(url, "iereports", year, year_range, report_type='inspection')
+  for year, url, body in parallel.download_by_year(audit_report_url, year_range, parse=str):
+    parse_result_from_js(body, "auditreports", year, year_range, report_type='audit')
+
+  # Pull the inspection reports
+  for year, url, body in parallel.download_by_year(inspection_report_url, year_range, parse=str):
+    parse_result_from_js(body, "iereports", year, year_range, report_type='inspection')
 
   # Pull the congressional testimony
-  doc = BeautifulSoup(utils.download(CONGRESSIONAL_TESTIMONY_REPORTS_URL))
+  doc = utils.parse_html(utils.download(CONGRESSIONAL_TESTIMONY_REPORTS_URL))
   results = doc.findAll("ul", type='disc')[0].select("li")
   for result in results:
     report = congressional_testimony_report_from(result, year_range)
@@ -54,19 +52,18 @@ def run(options):
       inspector.save_report(report)
 
   # Pull the semiannual reports
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.parse_html(utils.download(SEMIANNUAL_REPORTS_URL))
   results = doc.findAll("ul", type='disc')[0].select("li")
   for result in results:
     report = semiannual_report_from(result, year_range)
     if report:
       inspector.save_report(report)
 
-def parse_result_from_js_url(url, format_slug, year, year_range, report_type):
+def parse_result_from_js(body, format_slug, year, year_range, report_type):
   """
-  Given a link to a javascript file that has report data, add all of the reports
+  Given the body of a javascript file that has report data, add all of the reports
   """
 
-  body = utils.download(url)
   # Pulling out javascript array values that look like:
   # arrid[0]=new AR("200720002","Stronger Management Oversight Is Required to Ensure Valuable Systems Modernization Expertise Is Received From the Federally Funded Research and Development Center Contractor","20061020","01",2,0,0,0);
   # Look in http://www.treasury.gov/tigta/oa_auditreports_fy14.js for some more examples.
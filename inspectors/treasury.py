@@ -6,8 +6,7 @@ import os
 import re
 from urllib.parse import urljoin, unquote
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from utils import utils, inspector, parallel
 
 # http://www.treasury.gov/about/organizational-structure/ig/Pages/audit_reports_index.aspx
 archive = 2005
@@ -91,11 +90,12 @@ def run(options):
   year_range = inspector.year_range(options, archive)
 
   # Pull the audit reports
-  for year in year_range:
+  def audit_url_for(year):
     if year < 2006:  # This is the oldest year for these reports
-      continue
-    url = AUDIT_REPORTS_BASE_URL.format(year)
-    doc = beautifulsoup_from_url(url)
+      return None
+    return AUDIT_REPORTS_BASE_URL.format(year)
+
+  for year, url, doc in parallel.download_by_year(audit_url_for, year_range):
     results = doc.find_all("tr", class_=["ms-rteTableOddRow-default",
                                          "ms-rteTableEvenRow-default"])
     if not results:
@@ -342,7 +342,7 @@ def semiannual_report_from(result, page_url, year_range):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.parse_html(body)
 
 
 utils.run(run) if (__name__ == "__main__") else None
@@ -6,8 +6,7 @@ import os
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from utils import utils, inspector, pagination
 
 # https://oig.usaid.gov
 archive = 1998
@@ -34,23 +33,21 @@ def run(options):
 
   # Pull the reports with pagination
   for report_type, report_url_format in PAGINATED_REPORT_FORMATS.items():
-    for page in range(0, 999):
-      url = report_url_format.format(page=page)
-      doc = BeautifulSoup(utils.download(url))
-      results = doc.select("li.views-row")
+    pages = pagination.numbered(
+      lambda page: report_url_format.format(page=page), first=0,
+      empty=lambda page: not page.doc.select("li.views-row"), name="usaid")
+    for page in pages:
+      results = page.doc.select("li.views-row")
       if not results:
-        if page == 0:
-          raise inspector.NoReportsFoundError("USAID (%s)" % report_type)
-        else:
-          break
+        raise inspector.NoReportsFoundError("USAID (%s)" % report_type)
 
       for result in results:
-        report = report_from(result, url, report_type, year_range)
+        report = report_from(result, page.url, report_type, year_range)
         if report:
           inspector.save_report(report)
 
   # Pull the semiannual reports (no pagination)
-  doc = BeautifulSoup(utils.download(SEMIANNUAL_REPORTS_URL))
+  doc = utils.parse_html(utils.download(SEMIANNUAL_REPORTS_URL))
   results = doc.select("li.views-row")
   if not results:
     raise inspector.NoReportsFoundError("USAID (semiannual reports)")
@@ -156,7 +153,7 @@ def semiannual_report_from(result, year_range):
     return
 
   landing_url = urljoin(SEMIANNUAL_REPORTS_URL, link.get('href'))
-  landing_page = BeautifulSoup(utils.download(landing_url))
+  landing_page = utils.parse_html(utils.download(landing_url))
 
   report_url = landing_page.select("div.filefield-file a")[0].get('href')
   report_filename = report_url.split("/")[-1]
@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 
-from utils import utils, inspector
-from bs4 import BeautifulSoup
+from utils import utils, inspector, reconcile
 from datetime import datetime
 import logging
 import os.path
@@ -23,12 +22,16 @@ archive = 1998
 #          defaults to
 #             including audits, reports to Congress, and research
 #             excluding press releases, SARC, and testimony to Congress
+#
+#   max_extra_fetches - most requests to spend per category re-fetching pages
+#          of the unstable report list, defaults to 100
 
 # The report list is not stable, so sometimes we need to fetch the same page of
-# results multiple times to get everything. This constant is the maximum number
-# of times we will do so.
+# results multiple times to get everything (see utils/reconcile.py). These
+# constants are the maximum number of times we will do so, and the most extra
+# requests we'll spend doing it for each category.
 MAX_RETRIES = 10
-REPORTS_PER_PAGE = 10
+MAX_EXTRA_FETCHES = 100
 
 def run(options):
   year_range = inspector.year_range(options, archive)
@@ -41,87 +44,41 @@ def run(options):
   for category_name, category_id in categories:
     pages = get_last_page(options, category_id)
 
-    rows_seen = set()
-    pages_to_fetch = range(1, pages + 1)
-
-    # While the reports themselves may shuffle around, the order of the dates
-    # of the reports and how many of each date we see on each page will stay
-    # constant. This dictionary will hold how many times we see each date.
-    # We can stop retrying pages once we have as many unique reports for each
-    # date as there are slots for that date.
-    date_slot_counts = {}
-
-    # This keeps track of how many unique reports we have found on each date,
-    # for comparison with the numbers above.
-    date_unique_report_counts = {}
-
-    # This dict maps from a report date to a list of pages on which that date
-    # was seen.
-    date_to_pages = {}
-
-    for retry in range(MAX_RETRIES):
-      for page in pages_to_fetch:
-        logging.debug("## Downloading %s, page %i, attempt %i" % \
-                             (category_name, page, retry))
-        url = url_for(options, page, category_id)
-        body = utils.download(url)
-        doc = BeautifulSoup(body)
-
-        results = doc.select(".views-row")
-        if not results:
-          if len(doc.select(".view")[0].contents) == 3 and \
-              len(doc.select(".view > .view-filters")) == 1:
-            # If we only have the filter box, and no content box or "pagerer,"
-            # then that just means this search returned 0 results.
-            pass
-          else:
-            # Otherwise, there's probably something wrong with the scraper.
-            raise inspector.NoReportsFoundError("USPS %s" % category_name)
-        for result in results:
-          if retry == 0:
-            timestamp = get_timestamp(result)
-            if timestamp in date_slot_counts:
-              date_slot_counts[timestamp] = date_slot_counts[timestamp] + 1
-            else:
-              date_slot_counts[timestamp] = 1
-              date_unique_report_counts[timestamp] = 0
-
-            if timestamp in date_to_pages:
-              if page not in date_to_pages[timestamp]:
-                date_to_pages[timestamp].append(page)
-            else:
-              date_to_pages[timestamp] = [page]
-
-          row_key = (str(result.text), result.a['href'])
-          if not row_key in rows_seen:
-            rows_seen.add(row_key)
-            timestamp = get_timestamp(result)
-            date_unique_report_counts[timestamp] = \
-                date_unique_report_counts[timestamp] + 1
-
-            report = report_from(result)
-            # inefficient enforcement of --year arg, USPS doesn't support it server-side
-            # TODO: change to published_on.year once it's a datetime
-            if inspector.year_from(report) not in year_range:
-              logging.warn("[%s] Skipping report, not in requested range." % report['report_id'])
-              continue
-
-            inspector.save_report(report)
-
-      pages_to_fetch = set()
-      for date, report_count in date_unique_report_counts.items():
-        if report_count < date_slot_counts[date]:
-          for page in date_to_pages[date]:
-            pages_to_fetch.add(page)
-      if len(pages_to_fetch) == 0:
-        break
-      pages_to_fetch = list(pages_to_fetch)
-      pages_to_fetch.sort()
+    reconciler = reconcile.ListingReconciler("usps %s" % category_name,
+      url_for=lambda page: url_for(options, page, category_id),
+      rows=lambda doc, page: results_from(doc, category_name),
+      row_key=lambda result: (str(result.text), result.a['href']),
+      row_date=get_timestamp,
+      max_passes=MAX_RETRIES,
+      budget=int(options.get('max_extra_fetches', MAX_EXTRA_FETCHES)))
+
+    for result in reconciler.rows_from(range(1, pages + 1)):
+      report = report_from(result)
+      # inefficient enforcement of --year arg, USPS doesn't support it server-side
+      # TODO: change to published_on.year once it's a datetime
+      if inspector.year_from(report) not in year_range:
+        logging.warn("[%s] Skipping report, not in requested range." % report['report_id'])
+        continue
+
+      inspector.save_report(report)
+
+def results_from(doc, category_name):
+  results = doc.select(".views-row")
+  if not results:
+    if len(doc.select(".view")[0].contents) == 3 and \
+        len(doc.select(".view > .view-filters")) == 1:
+      # If we only have the filter box, and no content box or "pagerer,"
+      # then that just means this search returned 0 results.
+      pass
+    else:
+      # Otherwise, there's probably something wrong with the scraper.
+      raise inspector.NoReportsFoundError("USPS %s" % category_name)
+  return results
 
 def get_last_page(options, category_id):
   url = url_for(options, 1, category_id)
   body = utils.download(url)
-  doc = BeautifulSoup(body)
+  doc = utils.parse_html(body)
   return last_page_for(doc)
 
 def get_timestamp(result):
@@ -0,0 +1,106 @@
+# A circuit breaker for each host, so a site that goes down mid-run doesn't
+# cost every one of its remaining requests a full round of retries.
+#
+# After FAILURE_THRESHOLD consecutive connection errors or 5xx responses from
+# a host, its breaker opens, and requests to it fail straight away with a
+# CircuitOpenError. Once COOL_DOWN seconds have passed, one request is let
+# through as a probe: if it succeeds the breaker closes again, and if it
+# fails the breaker stays open for another cool down. Any other response,
+# including a 404, shows the host is up.
+#
+# Rather than a notification per failed URL, one notification listing every
+# host whose breaker opened is sent at the end of the run.
+
+import time
+import logging
+import threading
+import urllib.parse
+
+import requests
+import scrapelib
+
+from . import admin
+
+FAILURE_THRESHOLD = 5
+COOL_DOWN = 10 * 60
+
+# a subclass of ConnectionError, so it's handled wherever a failed
+# connection already is
+class CircuitOpenError(requests.exceptions.ConnectionError):
+  pass
+
+class Breaker(object):
+  def __init__(self, host):
+    self.host = host
+    self.failures = 0
+    self.opened_at = None
+    self.probing = False
+    self.times_opened = 0
+    self.skipped = 0
+    self.last_error = None
+
+_breakers = {}
+_lock = threading.Lock()
+
+def breaker_for(url):
+  host = urllib.parse.urlparse(url)[1].split(':')[0].lower()
+  if host not in _breakers:
+    _breakers[host] = Breaker(host)
+  return _breakers[host]
+
+# whether an exception means the host itself is failing
+def is_host_failure(exception):
+  if isinstance(exception, scrapelib.HTTPError):
+    return exception.response.status_code >= 500
+  return isinstance(exception, (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.packages.urllib3.exceptions.MaxRetryError,
+  ))
+
+# call before a request: raises CircuitOpenError if it shouldn't be sent
+def before(url):
+  with _lock:
+    breaker = breaker_for(url)
+    if breaker.opened_at is None:
+      return
+    if (not breaker.probing) and (time.time() - breaker.opened_at) >= COOL_DOWN:
+      logging.warn("[%s] Probing whether the host has recovered" % breaker.host)
+      breaker.probing = True
+      return
+    breaker.skipped += 1
+    raise CircuitOpenError("Not requesting %s, %s has been failing" % (url, breaker.host))
+
+# call with a request's exception, or None if it succeeded
+def after(url, exception=None):
+  with _lock:
+    breaker = breaker_for(url)
+    if exception is None or not is_host_failure(exception):
+      if breaker.opened_at is not None and breaker.probing:
+        logging.warn("[%s] Host has recovered" % breaker.host)
+        breaker.opened_at = None
+      breaker.probing = False
+      breaker.failures = 0
+      return
+
+    breaker.failures += 1
+    breaker.last_error = "%s: %s" % (exception.__class__.__name__, exception)
+    if breaker.probing:
+      breaker.probing = False
+      breaker.opened_at = time.time()
+    elif breaker.opened_at is None and breaker.failures >= FAILURE_THRESHOLD:
+      logging.warn("[%s] %i errors in a row, not sending it requests for %is" % (
+        breaker.host, breaker.failures, COOL_DOWN))
+      breaker.opened_at = time.time()
+      breaker.times_opened += 1
+
+# utils.finish() calls this when the run is over
+def notify_summary():
+  opened = [breaker for breaker in _breakers.values() if breaker.times_opened]
+  if not opened:
+    return
+  lines = ["Stopped sending requests to failing hosts:"]
+  for breaker in sorted(opened, key=lambda breaker: breaker.host):
+    lines.append("%s: opened %i time(s), %i requests skipped, last error: %s" % (
+      breaker.host, breaker.times_opened, breaker.skipped, breaker.last_error))
+  admin.notify("\n".join(lines))
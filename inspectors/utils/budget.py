@@ -0,0 +1,85 @@
+# Limits on how much a single scraper run may do, so that a run over every IG
+# takes a predictable amount of time:
+#
+#   --max_requests=N  stop after N requests
+#   --max_bytes=N     stop after downloading N bytes
+#   --time_budget=N   stop after N seconds
+#
+# Every request made through utils.scraper counts against the budget of the
+# scraper currently running. Once a limit is reached, the next request
+# raises BudgetExhausted, which utils.run() catches: the scraper stops where
+# it is, everything it saved so far stays saved, and the exhaustion is
+# recorded in the "budget" store, keyed by scraper.
+
+import time
+import logging
+import threading
+
+from . import store
+
+class BudgetExhausted(Exception):
+  pass
+
+class Budget(object):
+  def __init__(self, max_requests=None, max_bytes=None, time_budget=None):
+    self.max_requests = max_requests
+    self.max_bytes = max_bytes
+    self.time_budget = time_budget
+    self.requests = 0
+    self.bytes = 0
+    self.started = time.time()
+
+  def exhausted(self):
+    if self.max_requests is not None and self.requests >= self.max_requests:
+      return "made %i requests" % self.requests
+    if self.max_bytes is not None and self.bytes >= self.max_bytes:
+      return "downloaded %i bytes" % self.bytes
+    if self.time_budget is not None and self.elapsed() >= self.time_budget:
+      return "ran for %is" % self.elapsed()
+    return None
+
+  def elapsed(self):
+    return time.time() - self.started
+
+_budget = Budget()
+_lock = threading.Lock()
+
+def integer_option(options, name):
+  value = options.get(name)
+  if value is None or value is True:
+    return None
+  return int(value)
+
+# start a fresh budget for a scraper run, from its options
+def start(options):
+  global _budget
+  _budget = Budget(
+    max_requests=integer_option(options, 'max_requests'),
+    max_bytes=integer_option(options, 'max_bytes'),
+    time_budget=integer_option(options, 'time_budget'),
+  )
+
+# call before a request: raises BudgetExhausted if it shouldn't be sent
+def check():
+  reason = _budget.exhausted()
+  if reason:
+    raise BudgetExhausted("Budget exhausted: %s" % reason)
+
+# call with each response received
+def spend(response):
+  with _lock:
+    _budget.requests += 1
+    if response is not None:
+      _budget.bytes += len(response.content or b"")
+
+def record(name, exception):
+  logging.warn("[%s] Stopping early. %s" % (name, exception))
+  budgets = store.Store("budget", shared=True)
+  budgets.set(name, {
+    'reason': str(exception),
+    'requests': _budget.requests,
+    'bytes': _budget.bytes,
+    'seconds': round(_budget.elapsed()),
+    'exhausted_at': time.time(),
+  })
+  budgets.close()
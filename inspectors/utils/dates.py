@@ -0,0 +1,102 @@
+# Parsing dates written in whichever of several formats a site uses.
+#
+# A Parser tries its formats in order and returns the date from the first
+# one that matches. Each call site has a Parser of its own, usually a
+# module-level constant, which tries the format that matched last time
+# first, since a page tends to write all its dates the same way. That means
+# formats which could both match a string must agree on the date it gives.
+# Parsers also remember the strings they've parsed, since the same dates
+# come up again and again.
+#
+# Before parsing, runs of whitespace become a single space, "Sept" becomes
+# "Sep", and ordinals lose their suffix ("1st" becomes "1").
+#
+# Each run counts how often each format matched, and utils.run() logs the
+# counts when it's over and adds them to the run's outcome.
+
+import re
+import logging
+import threading
+import collections
+from datetime import datetime
+
+# strings remembered by each Parser before it starts over
+MAX_REMEMBERED = 10000
+
+WHITESPACE_RE = re.compile(r"\s+")
+SEPT_RE = re.compile(r"(?<![A-Za-z])Sept(?![A-Za-z])")
+ORDINAL_RE = re.compile(r"(?<=[0-9])(st|nd|rd|th)\b")
+
+_lock = threading.Lock()
+_counts = collections.Counter()  # format -> times it matched
+_unparsed = 0
+_repeats = 0
+
+def clean(text):
+  text = WHITESPACE_RE.sub(" ", text).strip()
+  text = SEPT_RE.sub("Sep", text)
+  return ORDINAL_RE.sub("", text)
+
+class Parser(object):
+  def __init__(self, *formats):
+    self.formats = list(formats)
+    self.remembered = {}
+    self.lock = threading.Lock()
+
+  def parse(self, text):
+    """Returns a datetime for text, in the first format it matches, or None
+    if it matches none of them."""
+    global _unparsed, _repeats
+    with self.lock:
+      if text in self.remembered:
+        with _lock:
+          _repeats += 1
+        return self.remembered[text]
+      formats = list(self.formats)
+
+    cleaned = clean(text)
+    parsed = None
+    for date_format in formats:
+      try:
+        parsed = datetime.strptime(cleaned, date_format)
+      except ValueError:
+        continue
+      with _lock:
+        _counts[date_format] += 1
+      break
+
+    with self.lock:
+      if parsed and self.formats[0] != date_format:
+        self.formats.remove(date_format)
+        self.formats.insert(0, date_format)
+      if len(self.remembered) >= MAX_REMEMBERED:
+        self.remembered.clear()
+      self.remembered[text] = parsed
+    if parsed is None:
+      with _lock:
+        _unparsed += 1
+    return parsed
+
+_parsers = {}
+
+# for one-off call sites, parses text with a Parser shared by every call
+# with the same formats
+def parse(text, *formats):
+  with _lock:
+    if formats not in _parsers:
+      _parsers[formats] = Parser(*formats)
+    parser = _parsers[formats]
+  return parser.parse(text)
+
+# how often each format matched this run, and how many strings matched none
+# or were answered from memory
+def stats():
+  with _lock:
+    return {"formats": dict(_counts), "unparsed": _unparsed, "repeats": _repeats}
+
+def log_counts(name, counts):
+  if not (counts["formats"] or counts["unparsed"]):
+    return
+  formats = sorted(counts["formats"].items(), key=lambda item: -item[1])
+  matched = ", ".join("%i %s" % (count, date_format) for date_format, count in formats)
+  logging.warn("[%s] Dates parsed: %s; %i unparsed, %i repeats" % (name, matched, counts["unparsed"], counts["repeats"]))
@@ -0,0 +1,81 @@
+# Support for scrapers that list the same report more than once (e.g. under
+# several topics) and merge the listings into a single report.
+#
+# Each report is saved (downloaded, extracted and written) the first time it's
+# seen, so that work isn't lost if the run dies. Later listings of the same
+# report are merged into a copy kept in an on-disk store, not in memory, and
+# reports whose merged fields changed have their JSON rewritten by
+# write_merged(). Scrapers call that even when a run stops early (e.g. at its
+# budget), and finalize() once it's over.
+#
+# Scrapers divide their work into stages (e.g. one per topic page). Completed
+# stages are recorded in the run's journal (see journal.py), and with
+# --resume a rerun after a crash skips stages that were already completed,
+# and carries on merging into the reports the crashed run stored.
+
+import os
+import json
+import logging
+
+from . import inspector
+from . import journal
+from . import store
+
+class ReportMerger(object):
+  def __init__(self, name, key, merge):
+    """name: a name for the store, usually the inspector's handle
+    key: function returning what identifies a report, e.g. (title, url)
+    merge: function that merges the fields of a new listing into the stored
+           report, changing it in place"""
+    self.key = key
+    self.merge = merge
+    self.store = store.Store(os.path.join("dedupe", name))
+
+    if journal.resuming_since() is None:
+      self.store.clear()
+
+  def stage_done(self, stage):
+    return journal.done("stage", stage)
+
+  # the stage's merges are committed before the stage is recorded as done,
+  # so a resumed run never skips a stage whose merges were lost
+  def stage_complete(self, stage):
+    self.store.commit()
+    journal.complete("stage", stage)
+    journal.checkpoint()
+
+  def add(self, report):
+    key = "report:%s" % json.dumps(self.key(report))
+    entry = self.store.get(key)
+
+    if entry is None:
+      written = inspector.save_report(report)
+      self.store.set(key, {'report': report, 'written': written, 'dirty': False})
+      return
+
+    stored = entry['report']
+    before = json.dumps(stored, sort_keys=True)
+    self.merge(stored, report)
+    if json.dumps(stored, sort_keys=True) != before:
+      entry['dirty'] = True
+      self.store.set(key, entry)
+
+  # rewrite the JSON of every report that gained fields from later listings
+  # since it was last written. The merged reports are kept, so a resumed run
+  # can go on merging into them.
+  def write_merged(self):
+    for key, entry in self.store.items("report:"):
+      if entry['written'] and entry['dirty']:
+        data_path = inspector.write_report(entry['report'])
+        logging.warn("[%s][%s][%s]\n\tmerged data: %s" % (
+          entry['report']['type'], entry['report']['published_on'],
+          entry['report']['report_id'], data_path))
+        entry['dirty'] = False
+        self.store.set(key, entry)
+    self.store.commit()
+
+  # the run is over: write any merged reports, then forget this run
+  def finalize(self):
+    self.write_merged()
+    self.store.clear()
+    self.store.close()
@@ -0,0 +1,111 @@
+# Many listing pages are byte-for-byte the same from one day to the next.
+# When a listing hasn't changed since a run that dealt with every report on
+# it, there's nothing new to find there, so it doesn't need to be parsed or
+# have its reports (and their landing pages) processed again.
+#
+# A Listing is a hash of a listing page's body, or of several pages that a
+# scraper processes together. Parts of a page that change on every request
+# without meaning anything (session tokens, ASP.NET view state) are removed
+# before hashing; scrapers can give patterns for other volatile parts, such
+# as a "last updated" timestamp.
+#
+# Hashes are kept in the "listings" store, keyed by URL and the requested
+# year range, along with the files of the reports saved from the listing.
+# They're only recorded when a run finishes without error (so work deferred
+# past the listing, like retries, has succeeded too), and only for listings
+# that no report failed to save during or after, so failures are retried on
+# the next run. A --dry_run records nothing. A listing is processed again,
+# however unchanged, when any of its reports' files have gone missing from
+# disk, and stored hashes are ignored while QA has reports from the
+# inspector queued for redownload, so they're saved again. Pass --force to
+# process every listing regardless.
+
+import os
+import re
+import hashlib
+import logging
+
+from . import utils
+from . import inspector
+from . import store
+
+# removed from every page before hashing
+VOLATILE = [
+  re.compile(r'<input[^>]+name="__(VIEWSTATE|VIEWSTATEGENERATOR|EVENTVALIDATION|REQUESTDIGEST)"[^>]*>', re.I),
+  re.compile(r'(jsessionid|phpsessid|cfid|cftoken|sid)=[\w.-]+', re.I),
+  re.compile(r'<input[^>]+name="[^"]*(csrf|token|nonce)[^"]*"[^>]*>', re.I),
+  re.compile(r'\snonce="[^"]*"', re.I),
+]
+
+_listings = None
+def listings():
+  global _listings
+  if _listings is None:
+    _listings = store.Store("listings", shared=True)
+  return _listings
+
+_inspector = None
+_redownloads = False
+_pending = []  # (key, entry, failed saves when the listing was done)
+
+# call when a scraper's run starts
+def start(name):
+  global _inspector, _redownloads, _pending
+  _inspector = name
+  _redownloads = next(store.redownload_queue().keys("%s/" % name), None) is not None
+  _pending = []
+
+# call when a scraper's run has finished without error, to record the
+# listings it dealt with
+def finish():
+  global _pending
+  failed_saves = inspector.failed_saves()
+  recorded = [(key, entry) for key, entry, failed_then in _pending if failed_then == failed_saves]
+  for key, entry in recorded:
+    listings().set(key, entry)
+  listings().commit()
+  _pending = []
+
+def normalize(body, volatile=()):
+  for pattern in VOLATILE + list(volatile):
+    body = re.sub(pattern, "", body)
+  return body
+
+class Listing(object):
+  def __init__(self, url, body, volatile=()):
+    """url: the listing's URL, or the first of a group's URLs
+    body: the listing's body, or a list of the group's bodies, in order
+    volatile: regular expressions for parts of the body to ignore"""
+    options = utils.options()
+    self.key = "%s since=%s year=%s archive=%s" % (
+      url, options.get('since'), options.get('year'), options.get('archive'))
+    self.force = bool(options.get('force'))
+    self.dry_run = bool(options.get('dry_run'))
+
+    bodies = body if isinstance(body, list) else [body]
+    digest = hashlib.sha256()
+    for body in bodies:
+      digest.update(normalize(body or "", volatile).encode("utf-8"))
+    self.digest = digest.hexdigest()
+
+    self.failed_saves = inspector.failed_saves()
+    self.saved_from = inspector.saved_file_count()
+
+    entry = listings().get(self.key)
+    self.unchanged = (not self.force) and (not _redownloads) and \
+      isinstance(entry, dict) and entry['digest'] == self.digest
+    if self.unchanged and not all_exist(entry['files']):
+      logging.warn("## %s is unchanged, but reports saved from it are missing" % url)
+      self.unchanged = False
+    if self.unchanged:
+      logging.warn("## Skipping %s, unchanged since the last run" % url)
+
+  # call once every report on the listing has been dealt with; the hash is
+  # recorded by finish()
+  def done(self):
+    if (not self.dry_run) and inspector.failed_saves() == self.failed_saves:
+      entry = {'digest': self.digest, 'files': inspector.saved_files(self.saved_from)}
+      _pending.append((self.key, entry, self.failed_saves))
+
+def all_exist(files):
+  return all(os.path.exists(os.path.join(utils.data_dir(), path)) for path in files)
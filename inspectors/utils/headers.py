@@ -0,0 +1,72 @@
+# A persistent cache of the response headers of report URLs, for scrapers
+# that have to fall back to HTTP headers (usually Last-Modified) to date a
+# report. Entries record when the URL was last checked, and are only checked
+# again once they're older than a TTL, so repeat runs don't have to send a
+# HEAD request per report.
+
+import time
+import logging
+import email.utils
+
+from . import utils
+from . import parallel
+from . import store
+
+# most of these files are years old and never change
+DEFAULT_TTL = 90 * 24 * 60 * 60
+
+_store = None
+def cache():
+  global _store
+  if _store is None:
+    _store = store.Store("headers", shared=True)
+  return _store
+
+def fresh(entry, ttl):
+  return entry is not None and (time.time() - entry['checked_at']) < ttl
+
+# the cached headers for a URL, sending a HEAD request only if it hasn't been
+# checked within ttl seconds. Errors are raised, as from utils.scraper.
+def lookup(url, ttl=DEFAULT_TTL):
+  entry = cache().get(url)
+  if not fresh(entry, ttl):
+    entry = check(url)
+  return entry
+
+def check(url):
+  verify_options = utils.domain_verify_options(url)
+  response = utils.scraper.request(method='HEAD', url=url, verify=verify_options)
+  entry = {
+    'last_modified': response.headers.get('Last-Modified'),
+    'etag': response.headers.get('ETag'),
+    'content_length': response.headers.get('Content-Length'),
+    'checked_at': time.time(),
+  }
+  cache().set(url, entry)
+  return entry
+
+# the year a cached URL was last modified, or None
+def year_modified(entry):
+  parsed = entry.get('last_modified') and email.utils.parsedate(entry['last_modified'])
+  return parsed[0] if parsed else None
+
+def refresh(prefix="", ttl=DEFAULT_TTL, years=None, workers=parallel.DEFAULT_WORKERS):
+  """Sends HEAD requests, concurrently, for every cached URL starting with
+  prefix that hasn't been checked within ttl seconds. Scrapers can call this
+  before a run, so that later lookups of URLs seen in earlier runs are all
+  answered from the cache. years, if given (e.g. a scraper's year range),
+  limits it to URLs last modified in one of those years; any others that
+  come up are checked by lookup() as they do."""
+  stale = [url for url, entry in cache().items(prefix)
+           if not fresh(entry, ttl) and (years is None or year_modified(entry) in years)]
+  if not stale:
+    return
+
+  logging.warn("Refreshing headers for %i URLs" % len(stale))
+  def check_logging_errors(url):
+    try:
+      check(url)
+    except utils.connection_errors() as e:
+      utils.log_http_error(e, url)
+  parallel.map_urls(check_logging_errors, stale, workers=workers)
+  cache().commit()
@@ -4,9 +4,13 @@ import re
 import logging
 import datetime
 import urllib.parse
-import atexit
+import json
+import time
+import threading
 
 from . import admin
+from . import journal
+from . import store
 # Save a report to disk, provide output along the way.
 #
 # 1) download report to disk
@@ -17,6 +21,7 @@ from . import admin
 # fields added: report_path, text_path
 
 def save_report(report):
+  global _failed_saves
   options = utils.options()
 
   # create some inferred fields, set defaults
@@ -33,6 +38,12 @@ def save_report(report):
 
   logging.warn("[%s][%s][%s]" % (report['type'], report['published_on'], report['report_id']))
 
+  unit = "%s/%s/%s" % (report['inspector'], report['year'], report['report_id'])
+  if journal.done("report", unit):
+    logging.warn("\tsaved before resuming, skipping")
+    return True
+
+  report_path = None
   if options.get('dry_run'):
     logging.warn('\tdry run: skipping download and extraction')
     if (not options.get('quick')) and report.get('url'):
@@ -43,6 +54,7 @@ def save_report(report):
     report_path = download_report(report)
     if not report_path:
       logging.warn("\terror downloading report: sadly, skipping.")
+      _failed_saves += 1
       return False
 
     logging.warn("\treport: %s" % report_path)
@@ -58,9 +70,36 @@ def save_report(report):
   data_path = write_report(report)
   logging.warn("\tdata: %s" % data_path)
 
+  index_landing_page(report, data_path)
+  journal.complete("report", unit)
+
+  with _saved_files_lock:
+    _saved_files.append(data_path)
+    if report_path:
+      _saved_files.append(report_path)
+
   return True
 
 
+# how many reports couldn't be saved this run
+_failed_saves = 0
+def failed_saves():
+  return _failed_saves
+
+# the files (relative to the data directory) of every report saved this
+# run, in the order they were saved
+_saved_files = []
+_saved_files_lock = threading.Lock()
+
+# pass how many there were before some work, to get the ones it saved
+def saved_files(since=0):
+  with _saved_files_lock:
+    return _saved_files[since:]
+
+def saved_file_count():
+  with _saved_files_lock:
+    return len(_saved_files)
+
 # Preprocess before validation, to catch cases where inference didn't work.
 # So, fields may be absent at this time.
 def preprocess_report(report):
@@ -232,11 +271,115 @@ def check_uniqueness(inspector, report_id, report_year):
       _uniqueness_messages.append(msg)
   _uniqueness_storage_runtime[inspector].add(report_id)
 
-@atexit.register
+# utils.finish() calls this when the run is over
 def verify_uniqueness_finalize_summary():
   if _uniqueness_messages:
     admin.notify('\n'.join(_uniqueness_messages))
 
+# Scrapers that visit a landing page for every report can skip that visit
+# for reports they've already saved, when run with --skip_landing. Saved
+# reports are indexed by their landing_url, and before fetching a landing
+# page a scraper asks cached_report() for the saved report. Add
+# --landing_max_age=N to only reuse reports whose landing page was fetched in
+# the last N days. Unreleased reports are never reused, since their landing
+# pages are where they'll eventually be released.
+_landing_index = None
+_landing_reused = set()
+# scrapers look up and save reports from several threads at once (e.g.
+# utils.listing's workers), so the index is updated under a lock
+_landing_lock = threading.RLock()
+def landing_index():
+  global _landing_index
+  with _landing_lock:
+    if _landing_index is None:
+      _landing_index = store.Store("landing", shared=True)
+    return _landing_index
+
+def landing_key(inspector, landing_url):
+  return "%s:%s" % (inspector, landing_url)
+
+def index_landing_page(report, data_path, saved_at=None):
+  landing_url = report.get('landing_url')
+  if (not landing_url) or report.get('unreleased', False) is True:
+    return
+
+  key = landing_key(report['inspector'], landing_url)
+  if key in _landing_reused:
+    # don't refresh saved_at, the landing page wasn't fetched this time
+    return
+
+  with _landing_lock:
+    entry = landing_index().get(key)
+    if entry and entry['path'] != data_path:
+      # more than one report shares this landing page, so it can't be skipped
+      entry['ambiguous'] = True
+    else:
+      entry = {'path': data_path, 'ambiguous': False}
+    entry['saved_at'] = saved_at or time.time()
+    landing_index().set(key, entry)
+
+# the first time an inspector's landing pages are looked up, index any
+# reports that were saved before the index existed
+def index_landing_pages_on_disk(inspector):
+  marker = "indexed:%s" % inspector
+  if marker in landing_index():
+    return
+
+  # only one thread indexes; the others wait for it, then find the marker
+  with _landing_lock:
+    if marker in landing_index():
+      return
+
+    inspector_path = os.path.join(utils.data_dir(), inspector)
+    if os.path.isdir(inspector_path):
+      for year_folder in os.listdir(inspector_path):
+        year_path = os.path.join(inspector_path, year_folder)
+        if not os.path.isdir(year_path):
+          continue
+        for report_id in os.listdir(year_path):
+          data_path = os.path.join(inspector, year_folder, report_id, "report.json")
+          real_data_path = os.path.join(utils.data_dir(), data_path)
+          if os.path.isfile(real_data_path):
+            with open(real_data_path, encoding='utf-8') as f:
+              report = json.load(f)
+            index_landing_page(report, data_path, os.path.getmtime(real_data_path))
+    landing_index().set(marker, True)
+    landing_index().commit()
+
+def cached_report(inspector, landing_url):
+  options = utils.options()
+  # --skip_downloaded is dod's older name for this
+  skip_landing = options.get('skip_landing') or options.get('skip_downloaded')
+  # when resuming, reports saved since the interrupted run began can be reused
+  resuming_since = journal.resuming_since()
+  if not (skip_landing or resuming_since):
+    return None
+
+  index_landing_pages_on_disk(inspector)
+  key = landing_key(inspector, landing_url)
+  entry = landing_index().get(key)
+  if (entry is None) or entry['ambiguous']:
+    return None
+
+  if (not skip_landing) and entry['saved_at'] < resuming_since:
+    return None
+
+  max_age = options.get('landing_max_age')
+  if max_age and (time.time() - entry['saved_at']) > float(max_age) * 24 * 60 * 60:
+    return None
+
+  real_data_path = os.path.join(utils.data_dir(), entry['path'])
+  if not os.path.isfile(real_data_path):
+    return None
+  with open(real_data_path, encoding='utf-8') as f:
+    report = json.load(f)
+  if report.get('unreleased', False) is True:
+    return None
+
+  logging.debug("[%s] Reusing saved report, skipping landing page" % landing_url)
+  _landing_reused.add(key)
+  return report
+
 # run over common string fields automatically
 sanitize_table = str.maketrans({
   "\xa0": " ",          # no-break space
@@ -261,16 +404,33 @@ def slugify(report_id):
     copy = copy.replace(char, "-")
   return copy
 
+_redownload_queue = None
 def download_report(report):
+  global _redownload_queue
   report_path = path_for(report, report['file_type'])
   binary = (report['file_type'].lower() in ('pdf', 'doc', 'ppt'))
 
+  # QA may have found that the copy on disk is bad
+  if _redownload_queue is None:
+    _redownload_queue = store.redownload_queue()
+  redownload = report_path in _redownload_queue
+  if redownload:
+    logging.warn("\tqueued for redownload, ignoring cached copy")
+
   result = utils.download(
     report['url'],
     os.path.join(utils.data_dir(), report_path),
-    {'binary': binary}
+    {'binary': binary, 'cache': not redownload}
   )
   if result:
+    if redownload:
+      # extracted text came from the bad copy
+      text_path = "%s.txt" % os.path.splitext(report_path)[0]
+      real_text_path = os.path.join(utils.data_dir(), text_path)
+      if os.path.exists(real_text_path):
+        os.remove(real_text_path)
+      _redownload_queue.delete(report_path)
+      _redownload_queue.commit()
     return report_path
   else:
     return None
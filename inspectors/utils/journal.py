@@ -0,0 +1,149 @@
+# A journal of each scraper run's progress, so that a long run (e.g. an
+# --archive backfill) that dies partway through can be picked up where it
+# left off, by running the scraper again with --resume.
+#
+# utils.run() starts a journal for every scraper it runs. As the scraper
+# works, it records the units of work it has completed:
+#
+#   page     listing pages, recorded by utils.pagination once every report on
+#            the page has been dealt with
+#   landing  landing pages, recorded by utils.listing with the report they
+#            gave
+#   report   reports, recorded by inspector.save_report()
+#   stage    stages of a dedupe.ReportMerger's work, e.g. hhs's topics
+#
+# With --resume, completed units are skipped. Without it, the journal is
+# started afresh, and when a run finishes it's cleared.
+#
+# Some work outlives the unit it came from: a RetryQueue (see retry.py)
+# saves a page's reports after the scraper has moved on to the next page.
+# Such work calls defer() when it's put off and resolve() once it's done.
+# While any is outstanding, completed units (other than reports, which are
+# complete once saved) are held back rather than recorded, and they're
+# recorded once it's all resolved, so a crash in between means they're done
+# again on --resume. If deferred work fails, the units held back are never
+# recorded.
+#
+# Work is checkpointed to disk at least every CHECKPOINT_EVERY seconds, so a
+# crash loses no more than that.
+
+import os
+import time
+import logging
+import threading
+
+from . import store
+
+CHECKPOINT_EVERY = 60
+
+class Journal(object):
+  def __init__(self, name, resume=False):
+    self.name = name
+    self.store = store.Store(os.path.join("journal", name))
+    # make each checkpoint durable once it's committed
+    self.store.db.execute("PRAGMA synchronous = FULL")
+
+    self.lock = threading.Lock()
+    self.deferred = 0   # deferred work outstanding
+    self.held = []      # (key, value) of units waiting on that work
+    self.failed = False # whether any of that work failed
+
+    self.resume = bool(resume and self.store.get("started_at"))
+    if self.resume:
+      logging.warn("[%s] Resuming, %i units of work already done" % (name, len(self.store) - 1))
+    else:
+      self.store.clear()
+      self.store.set("started_at", time.time())
+      self.store.commit()
+    self.started_at = self.store.get("started_at")
+    self.checkpointed_at = time.time()
+
+  def done(self, kind, unit):
+    return ("%s:%s" % (kind, unit)) in self.store
+
+  def get(self, kind, unit, default=None):
+    return self.store.get("%s:%s" % (kind, unit), default)
+
+  def complete(self, kind, unit, value=True):
+    with self.lock:
+      if self.deferred and kind != "report":
+        self.held.append(("%s:%s" % (kind, unit), value))
+        return
+    self.store.set("%s:%s" % (kind, unit), value)
+    if (time.time() - self.checkpointed_at) >= CHECKPOINT_EVERY:
+      self.checkpoint()
+
+  def defer(self):
+    with self.lock:
+      self.deferred += 1
+
+  def resolve(self, succeeded=True):
+    with self.lock:
+      self.deferred -= 1
+      self.failed = self.failed or not succeeded
+      if self.deferred:
+        return
+      held, self.held = self.held, []
+      failed, self.failed = self.failed, False
+    if failed:
+      logging.warn("[%s] Not recording %i units of work, work put off from them failed" % (self.name, len(held)))
+      return
+    for key, value in held:
+      self.store.set(key, value)
+
+  def checkpoint(self):
+    self.store.commit()
+    self.checkpointed_at = time.time()
+
+  # the run is over, there's nothing to resume
+  def finish(self):
+    self.store.clear()
+    self.store.close()
+
+_journal = None
+
+def start(name, options):
+  global _journal
+  _journal = Journal(name, resume=bool(options.get('resume')))
+
+def finish():
+  global _journal
+  if _journal:
+    _journal.finish()
+    _journal = None
+
+# the rest do nothing when no journal has been started, e.g. outside of
+# utils.run()
+
+def done(kind, unit):
+  return _journal is not None and _journal.done(kind, unit)
+
+def get(kind, unit, default=None):
+  if _journal is None:
+    return default
+  return _journal.get(kind, unit, default)
+
+def complete(kind, unit, value=True):
+  if _journal is not None:
+    _journal.complete(kind, unit, value)
+
+# call when work is put off past the unit it belongs to
+def defer():
+  if _journal is not None:
+    _journal.defer()
+
+# call once that work is done, or has failed
+def resolve(succeeded=True):
+  if _journal is not None:
+    _journal.resolve(succeeded)
+
+# commit what's been recorded now, rather than at the next checkpoint
+def checkpoint():
+  if _journal is not None:
+    _journal.checkpoint()
+
+# when the run being resumed started, or None when not resuming
+def resuming_since():
+  if _journal is None or not _journal.resume:
+    return None
+  return _journal.started_at
@@ -0,0 +1,123 @@
+# A base class for scrapers that follow the most common pattern: fetch one or
+# more listing pages, pull a report out of each row, and maybe visit each
+# report's landing page to fill in the rest.
+#
+# A scraper declares each of those steps, and ListingScraper.run() does the
+# work. Because it knows the structure of the scrape, it can:
+#
+#   * skip rows outside the requested years before visiting landing pages
+#   * visit the landing pages of a listing page concurrently
+#   * reuse saved reports instead of visiting landing pages (--skip_landing)
+#   * record completed listing pages and landing pages in the run's journal
+#     as it goes, so with --resume an interrupted run picks up where it left
+#     off
+#
+# Scrapers written as a plain run(options) function don't need to change.
+
+import abc
+import datetime
+import logging
+
+from . import utils
+from . import inspector
+from . import journal
+from . import pagination
+from . import parallel
+
+class ListingScraper(metaclass=abc.ABCMeta):
+  """Subclasses set `inspector` (the IG's handle), `archive` (the oldest
+  year with reports), `listing_urls` and `row_selector`, and implement
+  report_from_row() and published_on(). Scrapers that visit landing pages
+  also implement report_from_landing()."""
+
+  inspector = None
+  archive = None
+  listing_urls = []
+  row_selector = None
+
+  # how many landing pages to fetch at once
+  landing_workers = parallel.DEFAULT_WORKERS
+
+  # -- steps for subclasses to declare
+
+  # the pages of a listing, as pagination.Page objects. Listings split over
+  # several pages return one of the walks in utils.pagination instead.
+  def pages(self, listing_url):
+    return pagination.listed([listing_url], name=self.inspector)
+
+  def rows(self, doc, page_url):
+    return doc.select(self.row_selector)
+
+  # a report dict from a row, without published_on, or None to skip the row
+  @abc.abstractmethod
+  def report_from_row(self, row, page_url):
+    pass
+
+  # a datetime for when a row's report was published
+  @abc.abstractmethod
+  def published_on(self, row, report):
+    pass
+
+  def landing_url(self, report):
+    return report.get('landing_url')
+
+  # fills in a report from its landing page, returning the report (or None to
+  # skip it). Scrapers without landing pages leave this alone.
+  report_from_landing = None
+
+  # -- the engine
+
+  def run(self, options):
+    self.options = options
+    self.year_range = inspector.year_range(options, self.archive)
+
+    for listing_url in self.listing_urls:
+      for page in self.pages(listing_url):
+        page_url = page.url
+        rows = self.rows(page.doc, page_url)
+        if (not rows) and page.number == 0:
+          raise inspector.NoReportsFoundError("%s (%s)" % (self.inspector, page_url))
+
+        reports = []
+        for row in rows:
+          report = self.report_from_row(row, page_url)
+          if not report:
+            continue
+          published_on = self.published_on(row, report)
+          if published_on.year not in self.year_range:
+            logging.debug("[%s] Skipping, not in requested range." % report.get('report_id'))
+            continue
+          report['published_on'] = datetime.datetime.strftime(published_on, "%Y-%m-%d")
+          reports.append(report)
+
+        if self.report_from_landing:
+          reports = parallel.map_urls(self.complete_from_landing, reports,
+            url=lambda report: self.landing_url(report) or "",
+            workers=self.landing_workers)
+
+        for report in reports:
+          if report:
+            inspector.save_report(report)
+
+  def complete_from_landing(self, report):
+    landing_url = self.landing_url(report)
+    if not landing_url:
+      return report
+
+    cached = inspector.cached_report(self.inspector, landing_url)
+    if cached:
+      return cached
+
+    if journal.done("landing", landing_url):
+      return journal.get("landing", landing_url)
+
+    logging.debug("Scraping landing url: %s" % landing_url)
+    report = self.report_from_landing(report, self.fetch(landing_url))
+    journal.complete("landing", landing_url, report)
+    return report
+
+  def fetch(self, url):
+    body = utils.download(url)
+    if body is None:
+      raise Exception("Failure fetching %s" % url)
+    return utils.parse_html(body)
@@ -0,0 +1,111 @@
+# Remembers the pages downloaded during a run, so a page that a scraper asks
+# for again (cross-linked topic pages, overlapping index pages) comes from
+# memory rather than the network.
+#
+# Pages are keyed by their canonical URL, so that e.g. "HTTP://Example.gov"
+# and "http://example.gov/#top" are the same page. When several threads ask
+# for the same page at once, one of them downloads it and the rest wait for
+# its result rather than sending requests of their own.
+#
+# Failed downloads aren't remembered, so asking again retries them. Callers
+# that reject a page (e.g. as a soft error) forget() it, and retries ask for
+# pages with utils.download(url, options={'cache': False}), which bypasses
+# the memo. To keep memory bounded, the least recently used pages are
+# forgotten once the pages remembered add up to more than MAX_CHARACTERS.
+
+import threading
+import collections
+import urllib.parse
+
+MAX_CHARACTERS = 64 * 1024 * 1024
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# the URL with its scheme and host lowercased, and without a default port or
+# a fragment
+def canonical(url):
+  parts = urllib.parse.urlsplit(url.strip())
+  scheme = parts.scheme.lower()
+  host = (parts.hostname or "").lower()
+  if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+    host = "%s:%i" % (host, parts.port)
+  if parts.username:
+    host = "%s@%s" % (parts.username, host)
+  return urllib.parse.urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+# a download in progress, that other threads can wait on
+class Flight(object):
+  def __init__(self):
+    self.leader = threading.current_thread()  # the thread downloading
+    self.landed = threading.Event()
+    self.body = None
+
+class Memo(object):
+  def __init__(self, max_characters=MAX_CHARACTERS):
+    self.max_characters = max_characters
+    self.bodies = collections.OrderedDict()  # least recently used first
+    self.characters = 0
+    self.flights = {}  # key -> Flight
+    self.lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.shared = 0  # waited on another thread's download
+
+  def fetch(self, url, download):
+    """Returns the body of url, calling download() to get it unless it's
+    already been downloaded, or is being downloaded by another thread."""
+    key = canonical(url)
+    with self.lock:
+      if key in self.bodies:
+        self.hits += 1
+        self.bodies.move_to_end(key)
+        return self.bodies[key]
+      flight = self.flights.get(key)
+      if flight:
+        self.shared += 1
+      else:
+        self.misses += 1
+        flight = self.flights[key] = Flight()
+
+    if flight.leader is not threading.current_thread():
+      flight.landed.wait()
+      return flight.body
+
+    try:
+      flight.body = download()
+      return flight.body
+    finally:
+      with self.lock:
+        if flight.body is not None:
+          self.remember(key, flight.body)
+        del self.flights[key]
+      flight.landed.set()
+
+  # call with the lock held
+  def remember(self, key, body):
+    self.bodies[key] = body
+    self.characters += len(body)
+    while self.characters > self.max_characters and len(self.bodies) > 1:
+      _, forgotten = self.bodies.popitem(last=False)
+      self.characters -= len(forgotten)
+
+  # a caller rejected the page, e.g. as a soft error, so it isn't served again
+  def forget(self, url):
+    with self.lock:
+      body = self.bodies.pop(canonical(url), None)
+      if body is not None:
+        self.characters -= len(body)
+
+  def stats(self):
+    return {"hits": self.hits, "misses": self.misses, "shared": self.shared}
+
+_memo = Memo()
+
+def fetch(url, download):
+  return _memo.fetch(url, download)
+
+def forget(url):
+  _memo.forget(url)
+
+def stats():
+  return _memo.stats()
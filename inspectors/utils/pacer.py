@@ -0,0 +1,122 @@
+# Paces requests to each host at a rate that adapts to how the host copes.
+#
+# Each host starts at the rate it ended the last run on (or INITIAL_RATE).
+# Every quick, successful response raises its rate by a little; a 429 or 503,
+# a timeout, or a Retry-After header halves it, and a Retry-After also holds
+# off all requests to the host until it's passed. Rates are kept in the
+# "pacing" store between runs, so each run starts near the right speed. They
+# change with almost every request, so they're kept in memory during a run,
+# and saved once, when it ends.
+
+import time
+import logging
+import sqlite3
+import threading
+import urllib.parse
+import email.utils
+
+import requests
+import scrapelib
+
+from . import store
+
+# all rates are in requests per minute
+INITIAL_RATE = 120
+MIN_RATE = 6
+MAX_RATE = 600
+INCREASE = 2
+DECREASE = 0.5
+
+# responses slower than this (in seconds) don't raise a host's rate
+SLOW_RESPONSE = 5
+
+BACK_OFF_STATUSES = (429, 503)
+
+class Pacer(object):
+  def __init__(self, host, rate):
+    self.host = host
+    self.rate = rate
+    self.saved_rate = rate
+    self.next_at = 0
+    self.lock = threading.Lock()
+
+  # blocks until the next request to the host may be sent
+  def wait(self):
+    with self.lock:
+      now = time.time()
+      at = max(now, self.next_at)
+      self.next_at = at + (60.0 / self.rate)
+    if at > now:
+      time.sleep(at - now)
+
+  def speed_up(self):
+    with self.lock:
+      self.rate = min(MAX_RATE, self.rate + INCREASE)
+
+  def slow_down(self, retry_after=None):
+    with self.lock:
+      self.rate = max(MIN_RATE, self.rate * DECREASE)
+      if retry_after:
+        self.next_at = max(self.next_at, time.time() + retry_after)
+    logging.warn("[%s] Slowing down to %i requests a minute" % (self.host, self.rate))
+
+_pacers = {}
+_lock = threading.Lock()
+_rates = None
+
+def rates():
+  global _rates
+  if _rates is None:
+    _rates = store.Store("pacing", shared=True)
+  return _rates
+
+# save the rates that changed this run; utils.finish() calls this when the
+# run is over
+def save():
+  with _lock:
+    changed = [pacer for pacer in _pacers.values() if pacer.rate != pacer.saved_rate]
+  # the rates are only a head start for the next run, so failing to save
+  # them mustn't fail the run
+  try:
+    for pacer in changed:
+      rates().set(pacer.host, pacer.rate)
+      pacer.saved_rate = pacer.rate
+  except sqlite3.OperationalError as exception:
+    logging.warn("Couldn't save the pacing rates: %s" % exception)
+
+def pacer_for(url):
+  host = urllib.parse.urlparse(url)[1].split(':')[0].lower()
+  with _lock:
+    if host not in _pacers:
+      _pacers[host] = Pacer(host, rates().get(host, INITIAL_RATE))
+    return _pacers[host]
+
+# seconds to wait from a Retry-After header, either a number of seconds or
+# an HTTP date
+def retry_after(response):
+  value = response is not None and response.headers.get('Retry-After')
+  if not value:
+    return None
+  if value.strip().isdigit():
+    return int(value)
+  parsed = email.utils.parsedate_tz(value)
+  if parsed is None:
+    return None
+  return max(0, email.utils.mktime_tz(parsed) - time.time())
+
+# call before a request
+def before(url):
+  pacer_for(url).wait()
+
+# call after a request with how long it took, and its response or exception
+def after(url, seconds, response=None, exception=None):
+  if isinstance(exception, scrapelib.HTTPError):
+    response = exception.response
+  pacer = pacer_for(url)
+
+  wait = retry_after(response)
+  timed_out = isinstance(exception, requests.exceptions.Timeout)
+  if timed_out or wait or (response is not None and response.status_code in BACK_OFF_STATUSES):
+    pacer.slow_down(wait)
+  elif exception is None and seconds < SLOW_RESPONSE:
+    pacer.speed_up()
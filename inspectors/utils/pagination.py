@@ -0,0 +1,177 @@
+# Walking the pages of a paginated listing.
+#
+# Listings come in three shapes, each with a helper below:
+#
+#   * listed() - a known sequence of page URLs
+#   * numbered() - pages addressed by number, up to a known last page or
+#     until a page comes back empty
+#   * next_link() - each page links to the one after it
+#
+# Whatever the shape, a Paginator:
+#
+#   * downloads page N+1 in the background while page N is being parsed
+#   * never visits the same URL twice, and stops if a page comes back
+#     identical to one already seen (some sites serve the last page again
+#     for any page number past the end)
+#   * times every page, and logs a summary when the walk is over. The
+#     timings of every page walked in a run are also kept, and utils.run()
+#     puts them in the run's outcome (see stats())
+#   * records each page in the run's journal once the caller is done with
+#     it, and with any work it put off till later (see journal.py), and with
+#     --resume, doesn't yield pages that were already done
+#   * doesn't yield pages that haven't changed since the last run that dealt
+#     with them (see fingerprint.py), and only parses pages when asked to
+
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import utils
+from . import fingerprint
+from . import journal
+
+_timings = []  # (url, seconds to download) for every page walked this run
+_timings_lock = threading.Lock()
+
+class Page(object):
+  def __init__(self, number, url, body, parse, seconds):
+    self.number = number  # counting from 0, in the order pages were walked
+    self.url = url
+    self.body = body
+    self.parse = parse
+    self.parsed = None
+    self.seconds = seconds  # time spent downloading the page
+
+  # the parsed page, parsed the first time it's needed
+  @property
+  def doc(self):
+    if self.parsed is None:
+      self.parsed = self.parse(self.body)
+    return self.parsed
+
+class Paginator(object):
+  def __init__(self, name=None, fetch=None, parse=None, prefetch=True, volatile=()):
+    """name: used when logging, usually the inspector's handle
+    fetch: function returning the body of a URL, utils.download by default
+    parse: function turning a body into a document, utils.parse_html by default
+    prefetch: whether to download the next page while this one is used
+    volatile: regular expressions for parts of pages that change on every
+              request, to ignore when checking if a page has changed"""
+    self.name = name or "pagination"
+    self.fetch = fetch or utils.download
+    self.parse = parse or utils.parse_html
+    self.prefetch = prefetch
+    self.volatile = volatile
+    self.timings = []  # (url, seconds to download) for every page walked
+
+  def timed_fetch(self, url):
+    started = time.time()
+    body = self.fetch(url)
+    return body, time.time() - started
+
+  def walk(self, first_url, next_url, empty=None):
+    """Yields a Page for first_url and each page after it. next_url(page)
+    returns the URL of the page after page, or None after the last one.
+    empty(page), if given, ends the walk at the first page it's true for; the
+    first page is always yielded, so callers can tell a listing with no
+    results from a broken one."""
+    visited = set()
+    digests = set()
+    executor = ThreadPoolExecutor(max_workers=1) if self.prefetch else None
+    started = time.time()
+
+    def request(url):
+      if executor:
+        return executor.submit(self.timed_fetch, url)
+      return url
+
+    def response(pending):
+      if executor:
+        return pending.result()
+      return self.timed_fetch(pending)
+
+    try:
+      url, number = first_url, 0
+      pending = request(url)
+      while url:
+        visited.add(url)
+        body, seconds = response(pending)
+        if body is None:
+          raise Exception("Failure fetching %s" % url)
+        self.timings.append((url, seconds))
+        with _timings_lock:
+          _timings.append((url, seconds))
+        logging.debug("[%s] Page %i downloaded in %.2fs: %s" % (self.name, number, seconds, url))
+
+        digest = hashlib.sha256(body if isinstance(body, bytes) else body.encode("utf-8")).hexdigest()
+        if digest in digests:
+          logging.warn("[%s] %s is identical to an earlier page, stopping" % (self.name, url))
+          break
+        digests.add(digest)
+
+        page = Page(number, url, body, self.parse, seconds)
+        if number > 0 and empty and empty(page):
+          break
+
+        following = next_url(page)
+        if following in visited:
+          logging.warn("[%s] %s links back to %s, stopping" % (self.name, url, following))
+          following = None
+        if following:
+          pending = request(following)
+
+        if journal.done("page", url):
+          logging.warn("## Skipping %s, already completed" % url)
+        else:
+          listing = fingerprint.Listing(url, body, self.volatile)
+          if not listing.unchanged:
+            yield page
+            listing.done()
+          journal.complete("page", url)
+        url, number = following, number + 1
+    finally:
+      if executor:
+        executor.shutdown(wait=True)
+
+    total = sum(seconds for url, seconds in self.timings)
+    logging.info("[%s] %i pages in %.2fs, %.2fs of it downloading" % (
+      self.name, len(self.timings), time.time() - started, total))
+
+# how many pages have been walked this run, how long they took to download,
+# and how long each one took
+def stats():
+  with _timings_lock:
+    return {
+      "pages": len(_timings),
+      "seconds": round(sum(seconds for url, seconds in _timings), 2),
+      "timings": [[url, round(seconds, 2)] for url, seconds in _timings],
+    }
+
+# a known sequence of page URLs
+def listed(urls, **kwargs):
+  urls = iter(urls)
+  first_url = next(urls, None)
+  if first_url is None:
+    return iter([])
+  return Paginator(**kwargs).walk(first_url, lambda page: next(urls, None))
+
+# pages addressed by number: url_for(number) is the URL of a page, and the
+# walk runs from first to last, or if last isn't known, until empty(page) is
+# true for a page
+def numbered(url_for, first=1, last=None, empty=None, **kwargs):
+  if last is None and empty is None:
+    raise ValueError("Walking numbered pages needs a last page or an empty() test")
+
+  def next_url(page):
+    number = first + page.number + 1
+    if last is not None and number > last:
+      return None
+    return url_for(number)
+  return Paginator(**kwargs).walk(url_for(first), next_url, empty=empty)
+
+# pages that link to each other: find_next(page) returns the URL of the next
+# page, or None on the last one. empty(page), if given, ends the walk early.
+def next_link(first_url, find_next, empty=None, **kwargs):
+  return Paginator(**kwargs).walk(first_url, find_next, empty=empty)
@@ -0,0 +1,97 @@
+# Helpers for making independent requests concurrently.
+#
+# Requests still go through utils.scraper, so each host's pace (see pacer.py)
+# still applies. On top of that, no more than MAX_PER_HOST requests are ever
+# in flight to the same host, however many threads are running.
+
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from . import utils
+
+MAX_PER_HOST = 4
+DEFAULT_WORKERS = 8
+
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+def host_for(url):
+  return urllib.parse.urlparse(url)[1].split(':')[0].lower()
+
+# a semaphore limiting concurrent requests to the host of a URL,
+# use as: `with parallel.host_slot(url): ...`
+def host_slot(url):
+  host = host_for(url)
+  with _host_slots_lock:
+    if host not in _host_slots:
+      _host_slots[host] = threading.BoundedSemaphore(MAX_PER_HOST)
+    return _host_slots[host]
+
+def map_urls(function, items, url=None, workers=DEFAULT_WORKERS):
+  """Calls function(item) for each item in a pool of threads, and returns the
+  results in the same order as items. url(item) gives the URL each call will
+  request, which is used to limit requests per host; by default each item is
+  taken to be a URL itself."""
+  return list(imap_urls(function, items, url=url, workers=workers))
+
+def imap_urls(function, items, url=None, workers=DEFAULT_WORKERS):
+  """Like map_urls(), but yields each result, in the same order as items, as
+  soon as it's ready, so callers can start on the first result while the
+  rest are fetched. If the caller stops early (or raises), calls that
+  haven't started are cancelled."""
+  items = list(items)
+  if url is None:
+    url = lambda item: item
+
+  def call(item):
+    with host_slot(url(item)):
+      return function(item)
+
+  if len(items) < 2 or workers == 1:
+    for item in items:
+      yield call(item)
+    return
+
+  executor = ThreadPoolExecutor(max_workers=workers)
+  futures = [executor.submit(call, item) for item in items]
+  futures.reverse()
+  try:
+    while futures:
+      # let go of each result once it's been handed over
+      yield futures.pop().result()
+  finally:
+    for future in futures:
+      future.cancel()
+    executor.shutdown(wait=True)
+
+def download_by_year(url_for, years, parse=None, workers=DEFAULT_WORKERS):
+  """For scrapers with a listing page or data file per year: downloads
+  url_for(year) for every year concurrently, and yields (year, url, doc) in
+  the order of years, as soon as each year (and every year before it) has
+  been downloaded. doc is parse(body), a BeautifulSoup document by default,
+  and is only parsed as it's yielded, so the caller can save each year's
+  reports before the next year is parsed. url_for can return None for years
+  with nothing to fetch. Years that share a URL are only fetched, and
+  yielded, for the first of them. A year that fails to download raises
+  when its turn comes, after the years before it have been yielded."""
+  if parse is None:
+    parse = utils.parse_html
+
+  urls = []
+  seen = set()
+  for year in years:
+    url = url_for(year)
+    if url and url not in seen:
+      seen.add(url)
+      urls.append((year, url))
+
+  def download(url):
+    body = utils.download(url)
+    if body is None:
+      raise Exception("Failure fetching %s" % url)
+    return body
+
+  bodies = imap_urls(download, [url for _, url in urls], workers=workers)
+  for (year, url), body in zip(urls, bodies):
+    yield year, url, parse(body)
@@ -0,0 +1,69 @@
+# Helpers shared by the QA scripts in scripts/.
+
+import os
+
+from . import store
+
+class FileResults(object):
+  """Remembers the result of a per-file QA check between runs. Each result is
+  stored along with the size and modification time the file had when it was
+  checked, and is only reused while both still match, so a nightly run only
+  needs to look at files that are new or have changed. Pass --full to ignore
+  (and replace) everything remembered from previous runs."""
+
+  def __init__(self, name, options=None):
+    options = {} if not options else options
+    self.full = options.get('full', False)
+    self.store = store.Store(os.path.join("qa", name))
+    self.seen = set()
+    self.recorded = set()
+    self.checked = 0
+    self.reused = 0
+
+  # returns (True, result, stat) if the file hasn't changed since its result
+  # was recorded, or (False, None, stat) if it needs to be checked again
+  def lookup(self, path):
+    stat = os.stat(path)
+    self.seen.add(path)
+
+    if not self.full:
+      entry = self.store.get(path)
+      if entry and entry['size'] == stat.st_size and \
+          entry['mtime'] == stat.st_mtime_ns:
+        self.reused += 1
+        return True, entry['result'], stat
+
+    return False, None, stat
+
+  # stat should be the one returned by lookup(), from before the file was read,
+  # so that a file modified during the check will be checked again next time.
+  # A file can be recorded more than once (e.g. as a check goes through
+  # stages), but is only counted as checked once.
+  def record(self, path, stat, result):
+    if path not in self.recorded:
+      self.recorded.add(path)
+      self.checked += 1
+    self.store.set(path, {
+      'size': stat.st_size,
+      'mtime': stat.st_mtime_ns,
+      'result': result,
+    })
+
+  # the remembered results of every file seen during this run
+  def results(self):
+    for path in sorted(self.seen):
+      entry = self.store.get(path)
+      if entry:
+        yield path, entry['result']
+
+  # forget files that weren't seen during this run, under the given paths
+  # (which should be every directory that was fully walked)
+  def prune(self, prefixes):
+    for prefix in prefixes:
+      prefix = os.path.join(prefix, "")
+      for path in list(self.store.keys(prefix)):
+        if path not in self.seen:
+          self.store.delete(path)
+
+  def close(self):
+    self.store.close()
@@ -0,0 +1,202 @@
+# Support for listings whose order isn't stable between requests, so that a
+# single pass over the pages can miss some reports (shuffled onto a page
+# already read) and see others twice.
+#
+# A reconciler knows a pass is complete in one of two ways:
+#
+#   * by date: while the rows themselves may shuffle around, the dates of the
+#     rows, and how many rows have each date, stay the same. The first pass
+#     records how many rows ("slots") each date has and which pages they were
+#     on, and pages holding dates with fewer unique rows than slots are
+#     re-fetched. This relies on rows only shuffling among rows with the
+#     same date.
+#   * by count: the listing says how many rows each page holds (e.g. ten to
+#     a page, and whatever's left on the last one). Pages that gave fewer new
+#     rows than they hold are re-fetched, until the listing's rows are all
+#     accounted for. Finding more new rows than the listing holds means the
+#     listing changed underneath the walk, and raises an AssertionError.
+#
+# Either way, pages are re-fetched until everything is accounted for, the
+# reconciler runs out of passes, or it spends its budget of extra requests.
+#
+# A re-fetched page whose body is identical to one already read for it can't
+# hold anything new, so it isn't parsed again. The pages of each pass are
+# independent, so they're fetched concurrently.
+#
+# How each listing reconciled in a run (how many extra requests it took, and
+# what was still missing when it stopped) is kept, and utils.run() puts it in
+# the run's outcome (see stats()).
+
+import hashlib
+import logging
+import threading
+
+from . import utils
+from . import parallel
+
+_outcomes = []  # a dict for each listing reconciled this run
+_outcomes_lock = threading.Lock()
+
+def stats():
+  with _outcomes_lock:
+    return [dict(outcome) for outcome in _outcomes]
+
+class ListingReconciler(object):
+  def __init__(self, name, url_for, rows, row_key, row_date=None,
+               expected=None, max_passes=10, budget=None, narrow=None,
+               fetch=None, workers=parallel.DEFAULT_WORKERS):
+    """name: used when logging, e.g. "usps audit"
+    url_for: function returning the URL of a page number
+    rows: function returning the rows of a parsed page, given (doc, page)
+    row_key: function returning what identifies a row, e.g. its link
+    row_date: function returning the date a row is listed under, to
+              converge by date
+    expected: function returning how many rows the listing has on a page,
+              given (page, rows) from its first fetch, to converge by count
+              instead
+    max_passes: most times any page will be fetched
+    budget: most requests to spend beyond the first pass, None for no limit
+    narrow: for sites that can list a single date's rows, a function
+            returning the URL of that listing for a date. Dates that
+            haven't converged after the first pass are fetched this way
+            before falling back to re-fetching pages. Only for converging
+            by date.
+    fetch: for listings that aren't fetched with a GET of url_for(page), a
+           function returning the body of a page, given (page, retry), where
+           retry is true once the first pass is over. url_for(page) is then
+           only used to limit concurrent requests per host.
+    workers: how many pages of a pass to fetch at once"""
+    self.name = name
+    self.url_for = url_for
+    self.rows = rows
+    self.row_key = row_key
+    self.row_date = row_date
+    self.expected = expected
+    self.max_passes = max_passes
+    self.budget = budget
+    self.narrow = narrow
+    self.fetch_page = fetch or (lambda page, retry: self.download(self.url_for(page), retry))
+    self.workers = workers
+
+    self.fetches = 0
+    self.extra_fetches = 0
+    self.identical = 0
+    self.unconverged = []
+    self.exhausted = False
+
+  def rows_from(self, pages):
+    """Yields each unique row found on the given page numbers, once."""
+    slots = {}       # date -> how many rows the listing has with that date
+    found = {}       # date -> how many unique rows we've seen with that date
+    date_pages = {}  # date -> pages that date was seen on
+    holds = {}       # page -> how many rows the listing has on it
+    new = {}         # page -> how many unique rows were first seen on it
+    digests = {}     # page -> digests of every body read for it
+    seen = set()
+
+    def new_rows(rows, page, first_pass):
+      if first_pass and self.expected:
+        holds[page] = self.expected(page, rows)
+      for row in rows:
+        date = self.row_date(row) if self.row_date else None
+        if first_pass and self.row_date:
+          slots[date] = slots.get(date, 0) + 1
+          date_pages.setdefault(date, set()).add(page)
+
+        key = self.row_key(row)
+        if key not in seen:
+          seen.add(key)
+          found[date] = found.get(date, 0) + 1
+          new[page] = new.get(page, 0) + 1
+          yield row
+
+    # dates, or when converging by count pages, that are still short of rows
+    def unconverged():
+      if self.expected:
+        if len(seen) >= sum(holds.values()):
+          return []
+        return sorted(page for page in holds if new.get(page, 0) < holds[page])
+      return sorted(date for date in slots if found.get(date, 0) < slots[date])
+
+    def check_count():
+      if self.expected and len(seen) > sum(holds.values()):
+        page = max(holds, key=lambda page: new.get(page, 0) - holds[page])
+        raise AssertionError("[%s] Found %d new reports on page %s, too many!" % (
+          self.name, new.get(page, 0), page))
+
+    def out_of_budget():
+      if self.budget is None or self.extra_fetches < self.budget:
+        return False
+      if not self.exhausted:
+        logging.warn("[%s] Spent all %i extra requests, giving up on convergence" % (self.name, self.budget))
+        self.exhausted = True
+      return True
+
+    to_fetch = list(pages)
+    for attempt in range(self.max_passes):
+      if attempt > 0:
+        if out_of_budget():
+          break
+        if self.budget is not None:
+          to_fetch = to_fetch[:self.budget - self.extra_fetches]
+        self.extra_fetches += len(to_fetch)
+
+      bodies = parallel.map_urls(lambda page: self.fetch_page(page, attempt > 0),
+        to_fetch, url=self.url_for, workers=self.workers)
+      self.fetches += len(to_fetch)
+
+      for page, body in zip(to_fetch, bodies):
+        if body is None:
+          raise Exception("Failure fetching page %s of %s" % (page, self.name))
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        if digest in digests.setdefault(page, set()):
+          self.identical += 1
+          continue
+        digests[page].add(digest)
+
+        rows = self.rows(utils.parse_html(body), page)
+        for row in new_rows(rows, page, attempt == 0):
+          yield row
+
+      check_count()
+
+      if attempt == 0 and self.narrow:
+        for date in unconverged():
+          if out_of_budget():
+            break
+          self.extra_fetches += 1
+          self.fetches += 1
+          body = self.download(self.narrow(date))
+          for row in new_rows(self.rows(utils.parse_html(body), None), None, False):
+            yield row
+
+      if self.expected:
+        to_fetch = unconverged()
+      else:
+        to_fetch = sorted(set(page for date in unconverged() for page in date_pages[date]))
+      if (not to_fetch) or out_of_budget():
+        break
+
+    self.unconverged = unconverged()
+    with _outcomes_lock:
+      _outcomes.append({
+        "name": self.name,
+        "fetches": self.fetches,
+        "extra_fetches": self.extra_fetches,
+        "budget": self.budget,
+        "unconverged": self.unconverged,
+      })
+    logging.warn("[%s] %i requests, %i of them extra to converge (%i identical to an earlier response)" % (
+      self.name, self.fetches, self.extra_fetches, self.identical))
+    if self.unconverged:
+      logging.warn("[%s] Still missing reports %s: %s" % (self.name,
+        "from pages" if self.expected else "dated",
+        ", ".join(str(missing) for missing in self.unconverged)))
+
+  # a re-fetch bypasses the pages remembered this run, or it would just get
+  # the same body back
+  def download(self, url, retry=False):
+    body = utils.download(url, options={'cache': not retry})
+    if body is None:
+      raise Exception("Failure fetching %s" % url)
+    return body
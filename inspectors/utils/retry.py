@@ -0,0 +1,128 @@
+# Some sites occasionally answer with a "soft error": a page that downloads
+# fine but says something went wrong, and that's fine a little later.
+#
+# Rather than sleep and retry inline, holding up the whole scraper, a
+# scraper hands such pages to a RetryQueue along with what to do with them.
+# A page that comes back as a soft error is queued to be retried after a
+# jittered, exponentially growing delay, and the scraper carries on with its
+# other rows meanwhile. Retries that have come due are made whenever another
+# page is requested, and drain() waits out whatever's left at the end.
+#
+# A queued retry is work deferred past the listing page it came from, so the
+# run's journal holds back recording pages as done until it's been handled.
+#
+# How the retries of every queue in a run went is added up, and utils.run()
+# puts the totals in the run's outcome (see stats()).
+
+import time
+import heapq
+import random
+import logging
+import itertools
+import threading
+
+from . import utils
+from . import memo
+from . import journal
+
+_totals = {"retried": 0, "retries": 0, "recovered": 0, "given_up": 0}
+_totals_lock = threading.Lock()
+
+def count(name):
+  with _totals_lock:
+    _totals[name] += 1
+
+# how many URLs were retried this run, how many retries that took, and how
+# many of those URLs recovered or were given up on
+def stats():
+  with _totals_lock:
+    return dict(_totals)
+
+class RetryQueue(object):
+  def __init__(self, name, soft_error, parse=None, max_attempts=5,
+               base_delay=3, max_delay=60):
+    """name: used when logging, usually the inspector's handle
+    soft_error: function given a parsed page, returning whether it's a soft
+                error that's worth retrying
+    parse: function turning a body into a page, utils.parse_html by default
+    max_attempts: most times a URL will be requested
+    base_delay, max_delay: bounds in seconds on the delay before a retry,
+                           which doubles with each attempt"""
+    self.name = name
+    self.soft_error = soft_error
+    self.parse = parse or utils.parse_html
+    self.max_attempts = max_attempts
+    self.base_delay = base_delay
+    self.max_delay = max_delay
+
+    self.queue = []
+    self.order = itertools.count()
+    self.retries = 0
+    self.retried = set()
+    self.recovered = 0
+    self.failed = []
+
+  def fetch(self, url, handle):
+    """Downloads url and calls handle(page) with the parsed page, either now
+    or, if it's a soft error, once a retry succeeds."""
+    self.poll()
+    self.attempt(url, handle, 1)
+
+  # make any retries that have come due, without waiting
+  def poll(self):
+    while self.queue and self.queue[0][0] <= time.time():
+      due, order, url, handle, attempt = heapq.heappop(self.queue)
+      self.attempt(url, handle, attempt)
+
+  # wait for and make every outstanding retry, then log how they went
+  def drain(self):
+    while self.queue:
+      wait = self.queue[0][0] - time.time()
+      if wait > 0:
+        time.sleep(wait)
+      self.poll()
+
+    if self.retried:
+      logging.warn("[%s] Retried %i URLs %i times: %i recovered, %i given up on" % (
+        self.name, len(self.retried), self.retries, self.recovered, len(self.failed)))
+    if self.failed:
+      raise Exception("[%s] Could not retrieve, after %i attempts each: %s" % (
+        self.name, self.max_attempts, ", ".join(self.failed)))
+
+  def attempt(self, url, handle, attempt):
+    # a retry must hit the network, not get the soft error back from memory
+    body = utils.download(url, options={'cache': attempt == 1})
+    if body is None:
+      raise Exception("Failure fetching %s" % url)
+
+    page = self.parse(body)
+    if not self.soft_error(page):
+      handle(page)
+      if attempt > 1:
+        self.recovered += 1
+        count("recovered")
+        journal.resolve()
+      return
+
+    memo.forget(url)
+    if attempt == 1:
+      journal.defer()
+    if attempt >= self.max_attempts:
+      logging.warn("[%s] Giving up on %s after %i attempts" % (self.name, url, attempt))
+      self.failed.append(url)
+      count("given_up")
+      journal.resolve(succeeded=False)
+      return
+
+    delay = self.delay(attempt)
+    logging.info("[%s] Soft error from %s, retrying in %.1fs" % (self.name, url, delay))
+    self.retries += 1
+    count("retries")
+    if url not in self.retried:
+      self.retried.add(url)
+      count("retried")
+    heapq.heappush(self.queue, (time.time() + delay, next(self.order), url, handle, attempt + 1))
+
+  def delay(self, attempt):
+    delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+    return delay * random.uniform(0.5, 1.5)
@@ -0,0 +1,114 @@
+# Runs several scrapers, each in a child process of its own (as ./igs does),
+# so that one scraper can't affect the others: it starts with fresh module
+# state, and if it hangs or uses too much memory, a watchdog kills it and
+# the others carry on. A few scrapers run at a time.
+#
+# Each scraper's outcome comes back as a dict, e.g.
+#   {"ig": "usps", "status": "ok", "seconds": 132}
+# where status is one of:
+#   ok, error, budget_exhausted - as reported by utils.run() in the child
+#   timeout                     - killed for running longer than the limit
+#   memory                      - killed for using more memory than the limit
+#   crashed                     - the child died without reporting back
+
+import time
+import logging
+import multiprocessing
+import queue
+
+from . import admin
+
+DEFAULT_WORKERS = 2
+DEFAULT_TIMEOUT = 6 * 60 * 60  # seconds
+DEFAULT_MAX_MEMORY = 2048  # megabytes of resident memory
+
+# how often the watchdog checks on the children, in seconds
+CHECK_EVERY = 1
+
+def run_child(ig, results):
+  from . import utils
+  scraper = __import__(ig)
+  utils.run(scraper.run)
+  outcome = dict(utils.last_run or {"status": "ok"})
+  outcome["ig"] = ig
+  results.put(outcome)
+
+  # child processes end with os._exit(), which skips exit handlers, so the
+  # stores are committed and the end-of-run summaries sent here
+  utils.finish()
+
+# resident memory of a process in megabytes, or None where /proc isn't
+# available
+def memory_of(pid):
+  try:
+    with open("/proc/%i/status" % pid) as f:
+      for line in f:
+        if line.startswith("VmRSS:"):
+          return int(line.split()[1]) / 1024
+  except (IOError, OSError, ValueError):
+    return None
+
+def run_all(igs, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, max_memory=DEFAULT_MAX_MEMORY):
+  """Runs each of igs in a child process, at most workers at a time, and
+  returns a list of their outcomes."""
+  # a fresh interpreter for every child, rather than a fork of this one
+  context = multiprocessing.get_context("spawn")
+  results = context.Queue()
+  waiting = list(igs)
+  running = {}  # ig -> (process, started)
+  reported = {}
+  outcomes = []
+
+  def finish(ig, outcome):
+    process, started = running.pop(ig)
+    outcome["ig"] = ig
+    outcome["seconds"] = round(time.time() - started)
+    if outcome["status"] != "ok":
+      logging.warn("[%s] %s" % (ig, outcome))
+    outcomes.append(outcome)
+
+  def collect():
+    while True:
+      try:
+        outcome = results.get_nowait()
+      except queue.Empty:
+        return
+      reported[outcome["ig"]] = outcome
+
+  while waiting or running:
+    while waiting and len(running) < workers:
+      ig = waiting.pop(0)
+      process = context.Process(target=run_child, args=(ig, results), name=ig)
+      process.start()
+      running[ig] = (process, time.time())
+
+    time.sleep(CHECK_EVERY)
+
+    collect()
+    for ig, (process, started) in list(running.items()):
+      if not process.is_alive():
+        process.join()
+        collect()  # it may have reported back just before exiting
+        if ig in reported:
+          finish(ig, reported.pop(ig))
+        else:
+          finish(ig, {"status": "crashed", "error": "exited with code %s" % process.exitcode})
+        continue
+
+      memory = memory_of(process.pid)
+      if time.time() - started > timeout:
+        problem = {"status": "timeout", "error": "ran for more than %is" % timeout}
+      elif memory is not None and memory > max_memory:
+        problem = {"status": "memory", "error": "used %iMB of memory" % memory}
+      else:
+        continue
+      process.terminate()
+      process.join()
+      finish(ig, problem)
+
+  killed = [outcome for outcome in outcomes if outcome["status"] in ("timeout", "memory", "crashed")]
+  if killed:
+    admin.notify("Scrapers that didn't finish:\n" + "\n".join(
+      "%s: %s, %s" % (outcome["ig"], outcome["status"], outcome["error"])
+      for outcome in killed))
+  return outcomes
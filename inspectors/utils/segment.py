@@ -0,0 +1,52 @@
+# Finding the context of elements in a page by walking it forwards, once,
+# rather than walking backwards from each element in turn. A backwards walk
+# per element costs time proportional to the page's size for every element,
+# which adds up on long archive pages with thousands of links.
+#
+#   * links() - every link, with the text leading up to it
+#   * last_before() - for each of several elements, the last element before
+#     it that matches a test, e.g. the heading a report is listed under
+
+import collections
+
+from bs4.element import NavigableString
+
+Link = collections.namedtuple("Link", ["preceding", "text", "href", "tag"])
+
+# yields a Link for each <a> in root, in order:
+#   preceding: the text between the end of the previous link (or the start of
+#              root) and this one
+#   text: the link's own text
+#   href: the link's href, or None
+#   tag: the <a> itself
+def links(root):
+  preceding = []
+  stack = [iter(root.children)]
+  while stack:
+    node = next(stack[-1], None)
+    if node is None:
+      stack.pop()
+    elif isinstance(node, NavigableString):
+      preceding.append(str(node))
+    elif node.name == "a":
+      yield Link("".join(preceding), node.text, node.get("href"), node)
+      preceding = []
+    else:
+      stack.append(iter(node.children))
+
+# returns a dict mapping the id() of each of targets to the last element
+# before it in root, in document order, for which matches(element) is true,
+# or None if there's no such element. Ancestors come before their
+# descendants.
+def last_before(root, targets, matches):
+  wanted = set(id(target) for target in targets)
+  found = {}
+  last = None
+  for element in root.descendants:
+    if id(element) in wanted:
+      found[id(element)] = last
+    if matches(element):
+      last = element
+  for target_id in wanted:
+    found.setdefault(target_id, None)
+  return found
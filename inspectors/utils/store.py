@@ -0,0 +1,152 @@
+# A small persistent key/value store, for state that should survive from one
+# run to the next (QA results, caches, checkpoints). Each store is a SQLite
+# file in the cache directory, so lookups don't require loading everything
+# into memory. Keys are strings, values are anything that json can serialize.
+#
+# Stores that scrapers running side by side (as ./igs runs them) all write
+# to, such as the pacing rates or the landing page index, are opened with
+# shared=True. Those use SQLite's write-ahead log, so reading never waits on
+# another process's writes, and commit every write, so no process holds the
+# write lock for longer than one write.
+
+import os
+import json
+import atexit
+import sqlite3
+import threading
+
+from . import admin
+
+# where state kept between runs (caches, QA results) lives, relative to the
+# root dir unless configured
+def cache_dir():
+  if admin.config and admin.config.get('cache_directory'):
+    return admin.config.get('cache_directory')
+  return "cache"
+
+class Store(object):
+  # commit automatically after this many writes, so that an interrupted run
+  # loses little work without paying for a commit on every write
+  COMMIT_EVERY = 1000
+
+  def __init__(self, name, path=None, shared=False):
+    if path is None:
+      path = os.path.join(cache_dir(), "%s.sqlite" % name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    self.path = path
+    self.lock = threading.RLock()
+    self.pending = 0
+    self.closed = False
+    self.commit_every = 1 if shared else self.COMMIT_EVERY
+    self.db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+    if shared:
+      self.db.execute("PRAGMA journal_mode = WAL")
+      self.db.execute("PRAGMA synchronous = NORMAL")
+    self.db.execute("CREATE TABLE IF NOT EXISTS entries "
+                    "(key TEXT PRIMARY KEY, value TEXT)")
+    self.db.commit()
+
+    with _open_lock:
+      _open.add(self)
+
+  def get(self, key, default=None):
+    with self.lock:
+      row = self.db.execute("SELECT value FROM entries WHERE key = ?",
+                            (key,)).fetchone()
+    if row is None:
+      return default
+    return json.loads(row[0])
+
+  def set(self, key, value):
+    with self.lock:
+      self.db.execute("INSERT OR REPLACE INTO entries (key, value) VALUES (?, ?)",
+                      (key, json.dumps(value, sort_keys=True)))
+      self.wrote()
+
+  def delete(self, key):
+    with self.lock:
+      self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+      self.wrote()
+
+  def __contains__(self, key):
+    with self.lock:
+      row = self.db.execute("SELECT 1 FROM entries WHERE key = ?",
+                            (key,)).fetchone()
+    return row is not None
+
+  def __len__(self):
+    with self.lock:
+      return self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+  # iterate over (key, value) pairs, optionally only keys with a given prefix,
+  # without reading the whole table into memory. Rows are fetched a page at a
+  # time, so it's safe to write to the store while iterating over it.
+  def items(self, prefix=""):
+    last = None
+    while True:
+      with self.lock:
+        if last is None:
+          rows = self.db.execute("SELECT key, value FROM entries "
+                                 "WHERE substr(key, 1, ?) = ? "
+                                 "ORDER BY key LIMIT ?",
+                                 (len(prefix), prefix, self.COMMIT_EVERY)).fetchall()
+        else:
+          rows = self.db.execute("SELECT key, value FROM entries "
+                                 "WHERE substr(key, 1, ?) = ? AND key > ? "
+                                 "ORDER BY key LIMIT ?",
+                                 (len(prefix), prefix, last, self.COMMIT_EVERY)).fetchall()
+      if not rows:
+        return
+      for key, value in rows:
+        yield key, json.loads(value)
+      last = rows[-1][0]
+
+  def keys(self, prefix=""):
+    for key, value in self.items(prefix):
+      yield key
+
+  def clear(self):
+    with self.lock:
+      self.db.execute("DELETE FROM entries")
+      self.commit()
+
+  def wrote(self):
+    self.pending += 1
+    if self.pending >= self.commit_every:
+      self.commit()
+
+  def commit(self):
+    with self.lock:
+      if not self.closed:
+        self.db.commit()
+      self.pending = 0
+
+  def close(self):
+    with self.lock:
+      if not self.closed:
+        self.db.commit()
+        self.db.close()
+        self.closed = True
+    with _open_lock:
+      _open.discard(self)
+
+# stores that haven't been closed yet
+_open = set()
+_open_lock = threading.Lock()
+
+# don't lose uncommitted writes when a run ends without closing its stores.
+# utils.finish() calls this, and it's also run at exit, for scripts that
+# use stores without going through utils.
+@atexit.register
+def close_all():
+  with _open_lock:
+    stores = list(_open)
+  for store in stores:
+    store.close()
+
+# reports whose saved copy turned out to be bad (e.g. a soft 404 error page),
+# keyed by their path relative to the data directory. They'll be downloaded
+# again the next time their scraper saves them.
+def redownload_queue():
+  return Store("redownload", shared=True)
@@ -1,4 +1,4 @@
-import os, os.path, errno, sys, traceback, subprocess
+import os, os.path, errno, sys, traceback, subprocess, time, threading, atexit
 import re, html.entities
 import json
 import logging
@@ -8,54 +8,100 @@ from datetime import datetime
 import ssl
 import requests
 import urllib.parse
-import io
-import gzip
+import zlib
 import certifi
 
 from . import admin
+from . import breaker
+from . import budget
+from . import dates
+from . import journal
+from . import memo
+from . import pacer
+from . import store
 
 # scraper should be instantiated at class-load time, so that it can rate limit appropriately
 import scrapelib
-scraper = scrapelib.Scraper(requests_per_minute=120, retry_attempts=3)
+
+class Scraper(scrapelib.Scraper):
+  """Sends every request through its host's circuit breaker (see breaker.py),
+  so requests to a host that keeps failing fail fast, counts it against the
+  running scraper's budget (see budget.py), gives it a timeout, and paces
+  requests to each host at a rate adapted to the host (see pacer.py)."""
+  def request(self, method, url, **kwargs):
+    budget.check()
+    breaker.before(url)
+    if kwargs.get('timeout') is None:
+      kwargs['timeout'] = timeout_for(url)
+    pacer.before(url)
+    started = time.time()
+    try:
+      response = super(Scraper, self).request(method, url, **kwargs)
+    except Exception as exception:
+      pacer.after(url, time.time() - started, exception=exception)
+      budget.spend(None)
+      breaker.after(url, exception)
+      raise
+    pacer.after(url, time.time() - started, response=response)
+    budget.spend(response)
+    breaker.after(url)
+    return response
+
+# seconds to wait for a connection to a host, and then for each read from it.
+# Slow hosts can be given their own, in admin.yml:
+#
+#   timeouts:
+#     www.example.gov: [30, 300]
+TIMEOUT = (15, 120)
+
+def timeout_for(url):
+  timeouts = (admin.config and admin.config.get('timeouts')) or {}
+  host = urllib.parse.urlparse(url)[1].split(':')[0].lower()
+  return tuple(timeouts.get(host, TIMEOUT))
+
+# (scrapelib's own fixed rate limit is turned off, pacer.py limits the rate)
+scraper = Scraper(requests_per_minute=0, retry_attempts=3)
 scraper.user_agent = "unitedstates/inspectors-general (https://github.com/unitedstates/inspectors-general)"
 
 class Soft404HttpAdapter(requests.adapters.HTTPAdapter):
   """Transport adapter that checks all responses against a blacklist of "file
-  not found" pages that are served with 200 status codes."""
+  not found" pages that are served with 200 status codes.
+
+  Only the start of each HTML page is checked, as error pages announce
+  themselves early: the first PEEK_BYTES of the page, decompressed as it's
+  read. The rest of the response is passed on as it comes, unread."""
+
+  PEEK_BYTES = 10240
+  READ_BYTES = 4096
 
-  SOFT_404_URLS_RE = re.compile(r"^(http://www\.dodig\.mil/errorpages/index\.html|http://www\.fec\.gov/404error\.shtml|http://www\.gpo\.gov/maintenance/error\.htm)$")
-  SOFT_404_BODY_SIGNATURES = {
-    "cftc.gov": b"<title>404 Page Not Found - CFTC</title>",
-    "cpb.org": b"<title>CPB: Page Not Found</title>",
-    "ncua.gov": b"Redirect.aspx?404",
-    "si.edu": b"<title>Page Not Found Smithsonian</title>",
-  }
+  SOFT_404_URLS_RE = re.compile(r"^(https?://www\.dodig\.mil/errorpages/index\.html|https?://www\.fec\.gov/404error\.shtml|https?://www\.gpo\.gov/maintenance/error\.htm)$")
+
+  # signatures by domain, added with soft_404_signature(): bytes to look for,
+  # or compiled regular expressions over bytes
+  SOFT_404_BODY_SIGNATURES = {}
+
+  # error pages are HTML, but not always labelled as such
+  HTML_CONTENT_TYPES = (None, "text/html", "application/xhtml+xml")
 
   def build_response(self, req, resp):
     domain = urllib.parse.urlparse(req.url)[1].split(':')[0]
     base_domain = ".".join(domain.split(".")[-2:])
-    if base_domain in self.SOFT_404_BODY_SIGNATURES:
-      if resp.getheader("Content-Type") in ["text/html; charset=utf-8",
-                                            "text/html"]:
-        data = resp.data
-        if resp.getheader("Content-Encoding") == "gzip":
-          decompressed_data = gzip.decompress(data)
-        else:
-          decompressed_data = data
-        body = io.BytesIO(data)
-        resp = requests.packages.urllib3.response.HTTPResponse(
-                body=body,
-                headers=resp.headers,
-                status=resp.status,
-                version=resp.version,
-                reason=resp.reason,
-                strict=resp.strict,
-                preload_content=False,
-        )
-        if decompressed_data.find(self.SOFT_404_BODY_SIGNATURES[base_domain], 0, 10240) != -1:
-          result = super(Soft404HttpAdapter, self).build_response(req, resp)
-          result.status_code = 404 # tells scrapelib to not retry
-          return result
+    signatures = self.SOFT_404_BODY_SIGNATURES.get(base_domain)
+    if signatures and media_type(resp.getheader("Content-Type")) in self.HTML_CONTENT_TYPES:
+      peeked, start = self.peek(resp)
+      resp = requests.packages.urllib3.response.HTTPResponse(
+              body=PeekedBody(peeked, resp),
+              headers=resp.headers,
+              status=resp.status,
+              version=resp.version,
+              reason=resp.reason,
+              preload_content=False,
+              original_response=resp._original_response,
+      )
+      if any(matches_signature(start, signature) for signature in signatures):
+        result = super(Soft404HttpAdapter, self).build_response(req, resp)
+        result.status_code = 404 # tells scrapelib to not retry
+        return result
 
     redirect = resp.get_redirect_location()
     result = super(Soft404HttpAdapter, self).build_response(req, resp)
@@ -64,20 +110,92 @@ class Soft404HttpAdapter(requests.adapters.HTTPAdapter):
 
     return result
 
-scraper.mount("http://www.cftc.gov/", Soft404HttpAdapter())
-scraper.mount("http://cftc.gov/", Soft404HttpAdapter())
-scraper.mount("http://www.dodig.mil/", Soft404HttpAdapter())
-scraper.mount("http://dodig.mil/", Soft404HttpAdapter())
-scraper.mount("http://www.fec.gov/", Soft404HttpAdapter())
-scraper.mount("http://fec.gov/", Soft404HttpAdapter())
-scraper.mount("http://www.gpo.gov/", Soft404HttpAdapter())
-scraper.mount("http://gpo.gov/", Soft404HttpAdapter())
-scraper.mount("http://www.cpb.org/", Soft404HttpAdapter())
-scraper.mount("http://cpb.org/", Soft404HttpAdapter())
-scraper.mount("http://www.ncua.gov/", Soft404HttpAdapter())
-scraper.mount("http://ncua.gov/", Soft404HttpAdapter())
-scraper.mount("http://www.si.edu/", Soft404HttpAdapter())
-scraper.mount("http://si.edu/", Soft404HttpAdapter())
+  # reads from the start of the response until PEEK_BYTES of the page have
+  # been decompressed, and returns the bytes read and the page's start
+  def peek(self, resp):
+    encoding = (resp.getheader("Content-Encoding") or "").strip().lower()
+    if encoding == "gzip":
+      decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif encoding == "deflate":
+      decompressor = zlib.decompressobj()
+    else:
+      decompressor = None
+
+    peeked, start = [], b""
+    while len(start) < self.PEEK_BYTES:
+      chunk = resp.read(self.READ_BYTES, decode_content=False)
+      if not chunk:
+        break
+      peeked.append(chunk)
+      if decompressor:
+        try:
+          start += decompressor.decompress(chunk, self.PEEK_BYTES - len(start))
+        except zlib.error:
+          break # let the rest of the stack report it
+      else:
+        start += chunk
+    return b"".join(peeked), start[:self.PEEK_BYTES]
+
+class PeekedBody(object):
+  """The body of a urllib3 response whose first bytes have already been read,
+  for a new response to read from: those bytes, then the rest of the
+  original response, undecoded."""
+
+  def __init__(self, peeked, resp):
+    self.peeked = peeked
+    self.resp = resp
+
+  def read(self, amt=None):
+    if not self.peeked:
+      return self.resp.read(amt, decode_content=False)
+    if amt is None:
+      data = self.peeked + self.resp.read(decode_content=False)
+      self.peeked = b""
+    else:
+      data = self.peeked[:amt]
+      self.peeked = self.peeked[amt:]
+    return data
+
+  def close(self):
+    self.peeked = b""
+    self.resp.close()
+
+  @property
+  def closed(self):
+    return (not self.peeked) and self.resp.closed
+
+# e.g. "text/html" for "text/html; charset=UTF-8", or None
+def media_type(content_type):
+  if not content_type:
+    return None
+  return content_type.split(";")[0].strip().lower()
+
+def matches_signature(start, signature):
+  if isinstance(signature, bytes):
+    return start.find(signature) != -1
+  return signature.search(start) is not None
+
+# treat pages from domain (e.g. "si.edu") that contain signature near their
+# start as 404s; signature is bytes, or a regular expression compiled from
+# bytes. Scrapers call this for error pages of their own.
+def soft_404_signature(domain, signature):
+  Soft404HttpAdapter.SOFT_404_BODY_SIGNATURES.setdefault(domain, []).append(signature)
+  mount_soft_404(domain)
+
+# checks responses from domain, over http or https, for soft 404s
+def mount_soft_404(domain):
+  for prefix in ("http://www.", "http://", "https://www.", "https://"):
+    scraper.mount("%s%s/" % (prefix, domain), Soft404HttpAdapter())
+
+soft_404_signature("cftc.gov", b"<title>404 Page Not Found - CFTC</title>")
+soft_404_signature("cpb.org", b"<title>CPB: Page Not Found</title>")
+soft_404_signature("ncua.gov", b"Redirect.aspx?404")
+soft_404_signature("si.edu", b"<title>Page Not Found Smithsonian</title>")
+
+# these redirect to an error page instead (SOFT_404_URLS_RE)
+mount_soft_404("dodig.mil")
+mount_soft_404("fec.gov")
+mount_soft_404("gpo.gov")
 
 # Temporary workaround for versions of requests that don't support RC4 by
 # default, but have no API to change it.
@@ -122,17 +240,97 @@ WHITELIST_SHA1_DOMAINS = (
 
 # will pass correct options on to individual scrapers whether
 # run through ./igs or individually, because argv[1:] is the same
-def run(run_method, additional=None):
+#
+# how the run went is left in last_run, e.g. {"status": "ok"}
+#
+# scraper is false for scripts that aren't scrapers (QA, backups), which
+# don't journal their progress or record listings (see journal.py and
+# fingerprint.py)
+last_run = None
+def run(run_method, additional=None, scraper=True):
+  global last_run, parser
   cli_options = options()
   configure_logging(cli_options)
 
   if additional:
     cli_options.update(additional)
+  parser = cli_options.get('parser', PARSER)
+
+  # these import utils
+  from . import fingerprint
+  from . import pagination
+  from . import reconcile
+  from . import retry
 
   try:
-    return run_method(cli_options)
+    budget.start(cli_options)
+    if scraper:
+      journal.start(scraper_name(run_method), cli_options)
+      fingerprint.start(scraper_name(run_method))
+    result = run_method(cli_options)
+    if scraper:
+      fingerprint.finish()
+      journal.finish()
+    last_run = {"status": "ok"}
+    return result
+  except budget.BudgetExhausted as exception:
+    budget.record(scraper_name(run_method), exception)
+    last_run = {"status": "budget_exhausted", "error": str(exception)}
   except Exception as exception:
     admin.notify(exception)
+    last_run = {"status": "error", "error": "%s: %s" % (exception.__class__.__name__, exception)}
+  finally:
+    memo_stats, parsing = memo.stats(), parsing_stats()
+    logging.warn("[%s] %i pages downloaded, %i repeat requests served from memory" % (
+      scraper_name(run_method), memo_stats["misses"], memo_stats["hits"] + memo_stats["shared"]))
+    logging.warn("[%s] %i documents parsed in %.2fs" % (
+      scraper_name(run_method), parsing["documents"], parsing["seconds"]))
+    paging = pagination.stats()
+    if paging["pages"]:
+      logging.warn("[%s] %i listing pages walked, %.2fs of it downloading" % (
+        scraper_name(run_method), paging["pages"], paging["seconds"]))
+    date_counts = dates.stats()
+    dates.log_counts(scraper_name(run_method), date_counts)
+    if last_run is not None:
+      last_run["memo"] = memo_stats
+      last_run["parsing"] = parsing
+      last_run["pagination"] = paging
+      last_run["retries"] = retry.stats()
+      last_run["reconcile"] = reconcile.stats()
+      last_run["dates"] = date_counts
+
+# the work left once a process is done with scraping: saving the pacing
+# rates, sending end-of-run summaries, and committing and closing every
+# store. It's run at exit, and runner.py calls it itself, since its child
+# processes exit without running exit handlers. It only runs once.
+_finished = False
+def finish():
+  global _finished
+  if _finished:
+    return
+  _finished = True
+
+  steps = [pacer.save, breaker.notify_summary]
+  # only scrapers use inspector.py, and it imports utils itself
+  inspector = sys.modules.get(__package__ + ".inspector")
+  if inspector:
+    steps.append(inspector.verify_uniqueness_finalize_summary)
+  for step in steps:
+    try:
+      step()
+    except Exception as exception:
+      logging.warn("Error finishing the run:\n\n%s" % format_exception(exception))
+  store.close_all()
+
+# registered after store's own exit handler, so it runs first
+atexit.register(finish)
+
+# the name of the scraper a run() function belongs to, e.g. "usps"
+def scraper_name(run_method):
+  name = run_method.__module__
+  if name == "__main__":
+    name = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+  return name
 
 # read options from the command line
 #   e.g. ./inspectors/usps.py --since=2012-03-04 --debug
@@ -205,28 +403,15 @@ def download(url, destination=None, options=None):
         log_http_error(e, url)
         return None
     else: # text
-      try:
-        if destination: logging.info("## \tto: %s" % destination)
-
-        # Special handler for downloading reports whose server has
-        # misconfigured their HTTPS, and for which no alternative
-        # exists.
-        # This happens very rarely, and scrapelib has a bug with
-        # verification options, so this disables the rate limiting
-        # provided by scrapelib.
-
-        verify_options = domain_verify_options(url)
-        response = scraper.get(url, verify=verify_options)
-
-      except connection_errors() as e:
-        log_http_error(e, url)
-        return None
-
-      body = response.text
-      if not isinstance(body, str): raise ValueError("Content not decoded.")
+      if destination: logging.info("## \tto: %s" % destination)
 
-      # don't allow 0-byte files
-      if (not body) or (not body.strip()):
+      # a page already downloaded this run is reused (unless the caller
+      # turned caching off)
+      if cache:
+        body = memo.fetch(url, lambda: download_text(url))
+      else:
+        body = download_text(url)
+      if body is None:
         return None
 
       # cache content to disk
@@ -240,7 +425,42 @@ def download(url, destination=None, options=None):
     # whether from disk or web, unescape HTML entities
     return unescape(body)
 
-def post(url, data=None, headers=None, **kwargs):
+# the body of a text page, or None if it couldn't be downloaded or was empty
+def download_text(url):
+  try:
+    # Special handler for downloading reports whose server has
+    # misconfigured their HTTPS, and for which no alternative
+    # exists.
+    # This happens very rarely, and scrapelib has a bug with
+    # verification options, so this disables the rate limiting
+    # provided by scrapelib.
+
+    verify_options = domain_verify_options(url)
+    response = scraper.get(url, verify=verify_options)
+
+  except connection_errors() as e:
+    log_http_error(e, url)
+    return None
+
+  body = response.text
+  if not isinstance(body, str): raise ValueError("Content not decoded.")
+
+  # don't allow 0-byte files
+  if (not body) or (not body.strip()):
+    return None
+
+  return body
+
+# cache_ttl: if given, successful responses are cached on disk, keyed by the
+# URL and the form data, and reused for that many seconds
+def post(url, data=None, headers=None, cache_ttl=None, **kwargs):
+  if cache_ttl:
+    key = post_cache_key(url, data)
+    cached = post_cache().get(key)
+    if cached and (time.time() - cached['saved_at']) < cache_ttl:
+      logging.info("## Cached POST: %s" % url)
+      return response_from_cache(cached)
+
   response = None
   try:
     verify_options = domain_verify_options(url)
@@ -249,6 +469,43 @@ def post(url, data=None, headers=None, **kwargs):
     log_http_error(e, url)
     return None
 
+  if cache_ttl and response.status_code == 200:
+    post_cache().set(key, {
+      'url': response.url,
+      'status_code': response.status_code,
+      'encoding': response.encoding,
+      'text': response.text,
+      'saved_at': time.time(),
+    })
+    post_cache().commit()
+
+  return response
+
+_post_cache = None
+def post_cache():
+  global _post_cache
+  if _post_cache is None:
+    _post_cache = store.Store("post", shared=True)
+  return _post_cache
+
+# the same form data in any order (or as a dict or a list of pairs) gives the
+# same key
+def post_cache_key(url, data):
+  if data is None:
+    payload = ""
+  elif isinstance(data, (str, bytes)):
+    payload = data if isinstance(data, str) else data.decode("utf-8")
+  else:
+    pairs = data.items() if isinstance(data, dict) else data
+    payload = urllib.parse.urlencode(sorted((str(k), str(v)) for k, v in pairs))
+  return "%s\n%s" % (url, payload)
+
+def response_from_cache(cached):
+  response = requests.models.Response()
+  response.url = cached['url']
+  response.status_code = cached['status_code']
+  response.encoding = cached['encoding'] or 'utf-8'
+  response._content = cached['text'].encode(response.encoding)
   return response
 
 def resolve_redirect(url):
@@ -259,9 +516,14 @@ def resolve_redirect(url):
     return url
 
 def connection_errors():
-  return (scrapelib.HTTPError, requests.exceptions.ConnectionError, requests.packages.urllib3.exceptions.MaxRetryError)
+  return (scrapelib.HTTPError, requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.packages.urllib3.exceptions.MaxRetryError)
 
 def log_http_error(e, url):
+  # failing hosts are reported all together, at the end of the run
+  if isinstance(e, breaker.CircuitOpenError):
+    print("Skipped %s, its host has been failing" % url)
+    return
+
   # intentionally print instead of using logging,
   # so that all 404s get printed at the end of the log
   message = "Error downloading %s:\n\n%s" % (url, format_exception(e))
@@ -269,11 +531,38 @@ def log_http_error(e, url):
   if admin.config and admin.config.get("slack"):
     admin.send_slack(message)
 
+# the parser behind BeautifulSoup, unless --parser names another one (e.g.
+# html5lib, slower but closer to a browser on badly broken pages)
+PARSER = "lxml"
+
+# the parser parse_html() uses, set from --parser once by run()
+parser = PARSER
+
+_parsing = {"documents": 0, "seconds": 0}
+_parsing_lock = threading.Lock()
+
+# parses an HTML page into a BeautifulSoup document. only, if given, is a
+# bs4.SoupStrainer, and the document is restricted to the parts of the page
+# it matches, which is much quicker to build when a scraper only needs e.g.
+# one table. Scrapers define their strainers once, at the top of the file.
+def parse_html(body, only=None):
+  started = time.time()
+  doc = BeautifulSoup(body, parser, parse_only=only)
+  with _parsing_lock:
+    _parsing["documents"] += 1
+    _parsing["seconds"] += time.time() - started
+  return doc
+
+# how many documents parse_html() has parsed, and how long it took
+def parsing_stats():
+  with _parsing_lock:
+    return dict(_parsing)
+
 # uses BeautifulSoup to do a naive extraction of text from HTML,
 # then writes it and returns the /data-relative path.
 def text_from_html(real_html_path, real_text_path):
   html = open(real_html_path, encoding='utf-8').read()
-  doc = BeautifulSoup(html)
+  doc = parse_html(html)
 
   for node in doc.findAll(['script', 'style']):
     node.extract()
@@ -338,20 +627,12 @@ PDF_TITLE_RE = re.compile("Title: +([^\r\n]*)\r?\n")
 PDF_KEYWORDS_RE = re.compile("Keywords: +([^\r\n]*)\r?\n")
 PDF_AUTHOR_RE = re.compile("Author: +([^\r\n]*)\r?\n")
 
+PDF_DATES = dates.Parser('%m/%d/%y %H:%M:%S', '%a %b %d %H:%M:%S %Y', '%A, %B %d, %Y %I:%M:%S %p')
+
 def parse_pdf_datetime(raw):
     if raw.strip() == "":
       return None
-    my_datetime = None
-    try:
-      my_datetime = datetime.strptime(raw, '%m/%d/%y %H:%M:%S')
-    except ValueError:
-      try:
-        my_datetime = datetime.strptime(raw, '%a %b %d %H:%M:%S %Y')
-      except ValueError:
-        try:
-          my_datetime = datetime.strptime(raw, '%A, %B %d, %Y %I:%M:%S %p')
-        except ValueError:
-          pass
+    my_datetime = PDF_DATES.parse(raw)
     if my_datetime:
       return datetime.strftime(my_datetime, '%Y-%m-%d')
     else:
@@ -400,10 +681,85 @@ def metadata_from_pdf(pdf_path):
   if author_match:
     metadata['author'] = author_match.group(1)
 
+  attachments = attachments_from_pdf(real_pdf_path)
+  if attachments:
+    metadata['attachments'] = attachments
+
   if metadata:
     return metadata
   return None
 
+# lists the names of files embedded in a PDF, by reading its EmbeddedFiles
+# name tree and any file attachment annotations. Only the objects involved are
+# parsed, and nothing is written to disk. Returns None if PyPDF2 isn't
+# installed or the PDF needs a password. A PDF that can't be parsed (which
+# upstream PDFs are, in all sorts of ways) gives an empty list.
+def attachments_from_pdf(real_pdf_path):
+  try:
+    import PyPDF2
+  except ImportError:
+    logging.warn("Install PyPDF2 to find PDF attachments! (pip install PyPDF2)")
+    return None
+  try:
+    from PyPDF2.errors import PdfReadError
+  except ImportError:
+    from PyPDF2.utils import PdfReadError  # PyPDF2 1.x
+
+  try:
+    with open(real_pdf_path, 'rb') as f:
+      reader = PyPDF2.PdfFileReader(f, strict=False)
+
+      # many reports are encrypted only to restrict permissions, and open
+      # with an empty password
+      if reader.isEncrypted and not reader.decrypt(''):
+        logging.warn("Can't find attachments in %s, it needs a password" % real_pdf_path)
+        return None
+
+      attachments = []
+      root = reader.trailer['/Root'].getObject()
+      names = root.get('/Names')
+      if names is not None:
+        embedded_files = names.getObject().get('/EmbeddedFiles')
+        if embedded_files is not None:
+          attachments.extend(embedded_file_names(embedded_files.getObject()))
+
+      for page in reader.pages:
+        annotations = page.get('/Annots')
+        if annotations is None:
+          continue
+        for annotation in annotations.getObject():
+          annotation = annotation.getObject()
+          if annotation.get('/Subtype') == '/FileAttachment' and '/FS' in annotation:
+            attachments.append(file_spec_name(annotation['/FS'].getObject()))
+
+      return attachments
+  except PdfReadError as exc:
+    logging.warn("Can't find attachments in %s, it can't be read: %s" % (real_pdf_path, exc))
+    return []
+  except Exception as exc:
+    logging.warn("Error finding attachments in %s:\n\n%s" % (real_pdf_path, format_exception(exc)))
+    return []
+
+# walks a PDF name tree, whose leaves are [name, file spec, name, file spec...]
+def embedded_file_names(node):
+  if '/Names' in node:
+    leaves = node['/Names'].getObject()
+    for i in range(0, len(leaves) - 1, 2):
+      yield file_spec_name(leaves[i + 1].getObject(), leaves[i])
+  if '/Kids' in node:
+    for kid in node['/Kids'].getObject():
+      for name in embedded_file_names(kid.getObject()):
+        yield name
+
+def file_spec_name(file_spec, default=None):
+  if isinstance(file_spec, dict):
+    for key in ('/UF', '/F'):
+      if key in file_spec:
+        return str(file_spec[key])
+  elif file_spec is not None:
+    return str(file_spec)
+  return str(default)
+
 def check_report_url(report_url):
   try:
     verify_options = domain_verify_options(report_url)
@@ -420,11 +776,7 @@ DOC_AUTHOR_RE = re.compile("Author: ([^,]*),")
 def parse_doc_datetime(raw):
   if raw.strip() == "":
     return None
-  my_datetime = None
-  try:
-    my_datetime = datetime.strptime(raw, '%a %b %d %H:%M:%S %Y')
-  except ValueError:
-    pass
+  my_datetime = dates.parse(raw, '%a %b %d %H:%M:%S %Y')
   if my_datetime:
     return datetime.strftime(my_datetime, '%Y-%m-%d')
   else:
@@ -515,35 +867,44 @@ def mkdir_p(path):
     else:
       raise
 
-# taken from http://effbot.org/zone/re-sub.htm#unescape-html
-def unescape(text):
+# HTML entities, e.g. "&amp;" or "&#8211;"
+ENTITY_RE = re.compile(r"&#?\w+;")
 
-  def remove_unicode_control(str):
-    remove_re = re.compile('[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]')
-    return remove_re.sub('', str)
+# control characters, other than tabs and newlines, which are removed
+CONTROL_CHARACTER_RE = re.compile('[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]')
 
-  def fixup(m):
-    text = m.group(0)
-    if text[:2] == "&#":
-      # character reference
-      try:
-        if text[:3] == "&#x":
-          return chr(int(text[3:-1], 16))
-        else:
-          return chr(int(text[2:-1]))
-      except ValueError:
-        pass
-    else:
-      # named entity
-      try:
-        text = chr(html.entities.name2codepoint[text[1:-1]])
-      except KeyError:
-        pass
-    return text # leave as is
-
-  text = re.sub("&#?\w+;", fixup, text)
-  text = remove_unicode_control(text)
-  return text
+# what each entity decodes to, starting with the named ones; character
+# references are added as they're decoded, up to MAX_ENTITIES
+ENTITIES = dict(("&%s;" % name, chr(codepoint)) for name, codepoint in html.entities.name2codepoint.items())
+MAX_ENTITIES = 10000
+
+def decode_entity(text):
+  if text[1] == "#":
+    # character reference
+    try:
+      if text[:3] == "&#x":
+        return chr(int(text[3:-1], 16))
+      else:
+        return chr(int(text[2:-1]))
+    except ValueError:
+      pass
+  return text # leave as is
+
+def unescape_entity(m):
+  text = m.group()
+  decoded = ENTITIES.get(text)
+  if decoded is None:
+    decoded = decode_entity(text)
+    if len(ENTITIES) < MAX_ENTITIES:
+      ENTITIES[text] = decoded
+  return decoded
+
+# decodes HTML entities, then removes control characters. The entity decoding
+# is taken from http://effbot.org/zone/re-sub.htm#unescape-html
+def unescape(text):
+  if "&" in text:
+    text = ENTITY_RE.sub(unescape_entity, text)
+  return CONTROL_CHARACTER_RE.sub('', text)
 
 # 'safe' scrapers listed in safe.yml
 def safe_igs():
@@ -3,10 +3,8 @@
 import datetime
 import logging
 import os
-import time
 
-from bs4 import BeautifulSoup
-from utils import utils, inspector
+from utils import utils, inspector, pagination, retry
 
 # http://www.va.gov/oig/apps/info/OversightReports.aspx
 archive = 1996
@@ -14,6 +12,9 @@ archive = 1996
 # options:
 #   standard since/year options for a year range to fetch from.
 #
+#   skip_landing: reuse reports that have already been saved, instead of
+#      visiting their landing pages.
+#
 # Notes for IG's web team:
 #
 
@@ -54,19 +55,23 @@ ERROR_PAGE_TEXT = 'This report summary cannnot be displayed at this time.'
 def run(options):
   year_range = inspector.year_range(options, archive)
 
+  # These landing pages occasionally return text indicating there was a
+  # temporary error, so they're retried later if necessary.
+  landing_pages = retry.RetryQueue("va", soft_error=is_error_page,
+                                   max_attempts=MAX_ATTEMPTS)
+
   # Pull the audit reports
-  for page in range(1, 1000):
-    doc = beautifulsoup_from_url("{}?RS={}".format(REPORTS_URL, page))
-    results = doc.select("div.leadin")
+  pages = pagination.numbered(lambda page: "{}?RS={}".format(REPORTS_URL, page),
+    empty=lambda page: not page.doc.select("div.leadin"), name="va")
+  for page in pages:
+    results = page.doc.select("div.leadin")
     if not results:
-      if page == 1:
-        raise inspector.NoReportsFoundError("VA (audit reports)")
-      else:
-        break
+      raise inspector.NoReportsFoundError("VA (audit reports)")
     for result in results:
-      report = report_from(result, year_range)
+      report = report_from(result, year_range, landing_pages)
       if report:
         inspector.save_report(report)
+  landing_pages.drain()
 
   # Pull the semiannual reports
   doc = beautifulsoup_from_url(SEMIANNUAL_REPORTS_URL)
@@ -90,7 +95,12 @@ def report_type_from_topic(topic):
   else:
     return 'other'
 
-def report_from(result, year_range):
+def is_error_page(landing_page):
+  return landing_page.select("div.report-summary")[0].text.strip() == ERROR_PAGE_TEXT
+
+# returns the report if it's already been saved, otherwise queues its landing
+# page, and saves it once the landing page has been fetched
+def report_from(result, year_range, landing_pages):
   link = result.select("a")[0]
   title = link.text
   landing_url = result.select("p.summary a")[0].get('href')
@@ -107,17 +117,16 @@ def report_from(result, year_range):
         'http://www.va.gov/oig/publications/report-summary.asp?id=2491':
     return
 
-  # These pages occassionally return text indicating there was a temporary
-  # error so we will retry if necessary.
-  for attempt in range(MAX_ATTEMPTS):
-    landing_page = beautifulsoup_from_url(landing_url)
-    page_text = landing_page.select("div.report-summary")[0].text.strip()
-    if page_text != ERROR_PAGE_TEXT:
-      break
-    time.sleep(3)
-  if attempt == MAX_ATTEMPTS - 1:
-    raise Exception("Could not retrieve url %s", landing_url)
+  cached = inspector.cached_report('va', landing_url)
+  if cached:
+    return cached
+
+  def save_from_landing(landing_page):
+    report = report_from_landing(landing_page, landing_url, title, published_on)
+    inspector.save_report(report)
+  landing_pages.fetch(landing_url, save_from_landing)
 
+def report_from_landing(landing_page, landing_url, title, published_on):
   field_mapping = {}
   for field in landing_page.select("div.report-summary tr"):
     field_name = field.select("th")[0].text.rstrip(":")
@@ -210,7 +219,7 @@ def semiannual_report_from(result, year_range):
 
 def beautifulsoup_from_url(url):
   body = utils.download(url)
-  return BeautifulSoup(body)
+  return utils.parse_html(body)
 
 def br_to_newline(subtree):
   br = subtree.find("br")
@@ -2,35 +2,140 @@
 
 import hashlib
 import os, os.path
-from inspectors.utils import utils
+import json
+from concurrent.futures import ProcessPoolExecutor
+from inspectors.utils import utils, qa
 import logging
 
+# options:
+#   --file_kind=reports: only compare downloaded reports (PDFs, HTML, etc.)
+#   --file_kind=text: only compare extracted text and JSON metadata
+#   --workers=N: number of processes to hash files with, defaults to one per CPU
+#   --json: print duplicate groups as JSON, instead of one line per group
+#   --full: ignore digests remembered from previous runs
+
+# files are compared in stages: first by size, then by a digest of their first
+# and last SAMPLE_SIZE bytes, and only then by a digest of their full contents
+SAMPLE_SIZE = 64 * 1024
+
+TEXT_EXTENSIONS = (".txt", ".json")
+
+def sample_digest(path):
+  hash = hashlib.sha256()
+  with open(path, 'rb') as f:
+    hash.update(f.read(SAMPLE_SIZE))
+    f.seek(-SAMPLE_SIZE, os.SEEK_END)
+    hash.update(f.read(SAMPLE_SIZE))
+  return hash.hexdigest()
+
+def full_digest(path):
+  hash = hashlib.sha256()
+  with open(path, 'rb') as f:
+    message = None
+    while message != b'':
+      message = f.read(1024 * 1024)
+      hash.update(message)
+  return hash.hexdigest()
+
 class Deduplicator(object):
-  def __init__(self):
-    self.hashes_to_names = {}
-
-  def add_and_check_file(self, filename):
-    hash = self.file_to_hash(filename)
-    if hash in self.hashes_to_names:
-      self.hashes_to_names[hash].append(filename)
-      return self.hashes_to_names[hash]
-    else:
-      self.hashes_to_names[hash] = [filename]
-      return None
-
-  def file_to_hash(self, path):
-    hash = hashlib.sha256()
-    with open(path, 'rb') as f:
-      message = None
-      while message != b'':
-        message = f.read(1024 * 1024)
-        hash.update(message)
-    return hash.digest()
+  def __init__(self, results, workers=None):
+    self.results = results
+    self.workers = workers
+    self.executor = None  # shared by every stage, started when first needed
+    self.sizes_to_names = {}
+    self.stats = {}
+    self.digests = {}
+
+  def add_file(self, path):
+    fresh, digests, stat = self.results.lookup(path)
+    self.stats[path] = stat
+    if fresh and isinstance(digests, dict):
+      self.digests[path] = digests
+    self.sizes_to_names.setdefault(stat.st_size, []).append(path)
+
+  # returns a list of groups of identical files, largest files first
+  def duplicates(self):
+    groups = [names for names in self.sizes_to_names.values() if len(names) > 1]
+
+    # for small files the sample already covers the whole file, so skip
+    # straight to the full digest
+    try:
+      groups = self.split(groups, "sample", sample_digest,
+                          lambda size: size > 2 * SAMPLE_SIZE)
+      groups = self.split(groups, "sha256", full_digest)
+    finally:
+      if self.executor:
+        self.executor.shutdown()
+        self.executor = None
+
+    duplicates = []
+    for names in groups:
+      duplicates.append({
+        "size": self.stats[names[0]].st_size,
+        "sha256": self.digests[names[0]]["sha256"],
+        "files": sorted(names),
+      })
+    duplicates.sort(key=lambda group: (-group["size"], group["files"]))
+    return duplicates
+
+  # compute (or reuse) the given digest for every file in each group, and
+  # split the groups up by it, dropping files that are left on their own
+  def split(self, groups, key, function, applies=None):
+    pending = []
+    for names in groups:
+      if applies and not applies(self.stats[names[0]].st_size):
+        continue
+      for name in names:
+        if key not in self.digests.get(name, {}):
+          pending.append(name)
+
+    # each digest is recorded as soon as it's computed, so a run that dies
+    # partway through a stage keeps the digests it got to
+    logging.debug("Computing %s digests for %i files" % (key, len(pending)))
+    for name, digest in zip(pending, self.map(function, pending)):
+      digests = self.digests.setdefault(name, {})
+      digests[key] = digest
+      self.results.record(name, self.stats[name], digests)
+
+    split_groups = []
+    for names in groups:
+      if applies and not applies(self.stats[names[0]].st_size):
+        split_groups.append(names)
+        continue
+      by_digest = {}
+      for name in names:
+        by_digest.setdefault(self.digests[name][key], []).append(name)
+      for names in by_digest.values():
+        if len(names) > 1:
+          split_groups.append(names)
+    return split_groups
+
+  # yields function(path) for each of paths, in order, as they're computed
+  def map(self, function, paths):
+    if self.workers == 1 or len(paths) < 2:
+      return map(function, paths)
+    if self.executor is None:
+      self.executor = ProcessPoolExecutor(max_workers=self.workers)
+    return self.executor.map(function, paths)
+
+def wanted(filename, file_kind):
+  _, extension = os.path.splitext(filename.lower())
+  if file_kind == "text":
+    return extension in TEXT_EXTENSIONS
+  elif file_kind == "reports":
+    return extension not in TEXT_EXTENSIONS
+  return True
 
 def run(options):
   ig_list = options.get("inspectors")
+  file_kind = options.get("file_kind")
+  workers = options.get("workers")
+  if workers:
+    workers = int(workers)
 
-  dedup = Deduplicator()
+  results = qa.FileResults("duplicate_files", options)
+  dedup = Deduplicator(results, workers)
+  walked = []
   data_dir = utils.data_dir()
   for inspector in os.listdir(data_dir):
     if not ig_list or inspector in ig_list:
@@ -38,11 +143,27 @@ def run(options):
 
       inspector_path = os.path.join(data_dir, inspector)
       if os.path.isdir(inspector_path):
+        walked.append(inspector_path)
         for dirpath, dirnames, filenames in os.walk(inspector_path):
           for filename in filenames:
-            result = dedup.add_and_check_file(os.path.join(dirpath, filename))
-            if result:
-              print("Duplicate files: " + ", ".join(result))
+            if wanted(filename, file_kind):
+              dedup.add_file(os.path.join(dirpath, filename))
+
+  duplicates = dedup.duplicates()
+  if options.get("json"):
+    if duplicates:
+      print(json.dumps(duplicates, sort_keys=True, indent=2))
+  else:
+    for group in duplicates:
+      print("Duplicate files: " + ", ".join(group["files"]))
+
+  logging.debug("Computed %i digests, reused digests for %i files from previous "
+                "runs" % (results.checked, results.reused))
+
+  # files skipped by --file_kind weren't seen, but keep their digests
+  if not file_kind:
+    results.prune(walked)
+  results.close()
 
 def main():
   import sys, os, os.path
@@ -1,12 +1,26 @@
 #!/usr/bin/env python
 
-import os, os.path, subprocess, tempfile, shutil
+import os, os.path
 import logging
-from inspectors.utils import utils
+from concurrent.futures import ProcessPoolExecutor
+from inspectors.utils import utils, qa
 
 def run(options):
   ig_list = options.get("inspectors")
 
+  try:
+    import PyPDF2
+  except ImportError:
+    PyPDF2 = None
+  if PyPDF2 is None:
+    print("Install PyPDF2 to find PDF attachments (pip install PyPDF2)")
+    return
+
+  results = qa.FileResults("find_pdf_attachments", options)
+  walked = []
+  pending = []
+  found = []
+  unreadable = []
   data_dir = utils.data_dir()
   for inspector in os.listdir(data_dir):
     if not ig_list or inspector in ig_list:
@@ -14,35 +28,45 @@ def run(options):
 
       inspector_path = os.path.join(data_dir, inspector)
       if os.path.isdir(inspector_path):
+        walked.append(inspector_path)
         for dirpath, dirnames, filenames in os.walk(inspector_path):
           for filename in filenames:
             _, extension = os.path.splitext(filename.lower())
             if extension == ".pdf":
-              try:
-                original = os.path.join(dirpath, filename)
-                decrypted_file, decrypted_path = tempfile.mkstemp(suffix=".pdf")
-                os.close(decrypted_file)
-                decrypted_file = None
-                logging.debug("Decrypting %s to %s" % (original, decrypted_path))
-                subprocess.check_call(["qpdf", "--decrypt", original, decrypted_path])
-                try:
-                  extract_dir = tempfile.mkdtemp()
-                  logging.debug("Extracting %s to %s" % (decrypted_path, extract_dir))
-                  subprocess.check_call(["pdftk", decrypted_path, "unpack_files"], cwd=extract_dir)
-                  attachments = os.listdir(extract_dir)
-                  if attachments:
-                    print("%s has the following attachments: %s" % (original, ', '.join(attachments)))
-                finally:
-                  shutil.rmtree(extract_dir)
-              except subprocess.CalledProcessError as e:
-                print(e)
-              finally:
-                try:
-                  if decrypted_file:
-                    os.close(decrypted_file)
-                    decrypted_file = None
-                finally:
-                  os.remove(decrypted_path)
+              original = os.path.join(dirpath, filename)
+              fresh, attachments, stat = results.lookup(original)
+              if not fresh:
+                pending.append((original, stat))
+              elif attachments is None:
+                unreadable.append(original)
+              elif attachments:
+                found.append((original, attachments))
+
+  # read new and changed PDFs in parallel
+  with ProcessPoolExecutor() as executor:
+    paths = [original for original, stat in pending]
+    for (original, stat), attachments in zip(pending, executor.map(attachments_in, paths)):
+      results.record(original, stat, attachments)
+      if attachments is None:
+        unreadable.append(original)
+      elif attachments:
+        found.append((original, attachments))
+
+  for original in sorted(unreadable):
+    print("Could not read attachments from %s" % original)
+  for original, attachments in sorted(found):
+    print("%s has the following attachments: %s" % (original, ', '.join(attachments)))
+
+  results.prune(walked)
+  results.close()
+
+# one bad PDF mustn't take down the whole pool
+def attachments_in(path):
+  try:
+    return utils.attachments_from_pdf(path)
+  except Exception as exc:
+    logging.warn("Error finding attachments in %s: %s" % (path, utils.format_exception(exc)))
+    return []
 
 def main():
   import sys, os, os.path
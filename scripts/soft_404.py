@@ -2,7 +2,9 @@
 
 import os, os.path
 import re
-from inspectors.utils import utils
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from inspectors.utils import utils, qa, store
 import logging
 import scrapelib
 
@@ -22,6 +24,24 @@ URLS = {
 
 IGS_WITH_BAD_404 = tuple(URLS.keys())
 
+# error pages announce themselves early, so only this much of each file is
+# scanned (the same amount Soft404HttpAdapter checks when downloading)
+SCAN_BYTES = 10240
+
+# files starting with one of these are binary documents, not error pages
+BINARY_SIGNATURES = (
+  b"%PDF",                              # PDF
+  b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",  # DOC, XLS, PPT
+  b"PK\x03\x04",                         # DOCX, XLSX, ZIP
+  b"\x89PNG",
+  b"GIF8",
+  b"\xff\xd8\xff",                        # JPEG
+)
+
+# report files (not extracted text or metadata) found to be error pages are
+# queued to be downloaded again the next time their scraper runs
+REDOWNLOAD_EXCLUDED_EXTENSIONS = (".txt", ".json")
+
 def run(options):
 
   ig_list = options.get("inspectors")
@@ -54,21 +74,68 @@ def run(options):
         print("False negative for %s (regular expression did not match error "
               "page contents)" % inspector)
 
+  results = qa.FileResults("soft_404", options)
+  walked = []
+  pending = {}
+  found = []
   data_dir = utils.data_dir()
   for inspector in os.listdir(data_dir):
     if (not ig_list or inspector in ig_list) and inspector in IGS_WITH_BAD_404:
       inspector_path = os.path.join(data_dir, inspector)
       if os.path.isdir(inspector_path):
+        walked.append(inspector_path)
         for dirpath, dirnames, filenames in os.walk(inspector_path):
           for filename in filenames:
             path = os.path.join(dirpath, filename)
-            try:
-              f = open(path, 'r', encoding='utf-8')
-              for line in f:
-                if PAGE_NOT_FOUND_STRING_RE.search(line):
-                  print("Soft 404 found: %s" % path)
-            except UnicodeDecodeError:
-              f = open(path, 'rb')
-              for line in f:
-                if PAGE_NOT_FOUND_BYTES_RE.search(line):
-                  print("Soft 404 found: %s" % path)
+            fresh, is_404, stat = results.lookup(path)
+            if not fresh:
+              pending.setdefault(inspector, []).append((path, stat))
+            elif is_404:
+              found.append(path)
+
+  # scan new and changed files, one inspector per process
+  with ProcessPoolExecutor() as executor:
+    futures = []
+    for inspector, files in pending.items():
+      paths = [path for path, stat in files]
+      futures.append((files, executor.submit(scan_files, paths)))
+    for files, future in futures:
+      for (path, stat), is_404 in zip(files, future.result()):
+        results.record(path, stat, is_404)
+        if is_404:
+          found.append(path)
+
+  queue = store.redownload_queue()
+  for path in sorted(found):
+    inspector, year, report_id = report_for(data_dir, path)
+    print("Soft 404 found: %s (report %s/%s/%s)" %
+          (path, inspector, year, report_id))
+    _, extension = os.path.splitext(path.lower())
+    if extension not in REDOWNLOAD_EXCLUDED_EXTENSIONS:
+      queue.set(os.path.relpath(path, data_dir), {
+        'inspector': inspector,
+        'year': year,
+        'report_id': report_id,
+        'reason': 'soft 404',
+      })
+  queue.close()
+
+  results.prune(walked)
+  results.close()
+
+# the inspector, year and report_id that a data file belongs to
+def report_for(data_dir, path):
+  parts = os.path.relpath(path, data_dir).split(os.sep)
+  return (parts + [None, None, None])[:3]
+
+def scan_files(paths):
+  return [is_soft_404(path) for path in paths]
+
+def is_soft_404(path):
+  with open(path, 'rb') as f:
+    if os.fstat(f.fileno()).st_size == 0:
+      return False
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+      if data[:8].startswith(BINARY_SIGNATURES):
+        return False
+      return PAGE_NOT_FOUND_BYTES_RE.search(data, 0, SCAN_BYTES) is not None
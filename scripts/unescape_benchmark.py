@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+
+import html.entities
+import os, os.path
+import random
+import re
+import timeit
+from inspectors.utils import utils
+
+# Checks utils.unescape() against the implementation it replaced, then times
+# both. The comparison runs over generated strings full of entities and
+# control characters, and over saved HTML pages from the data directory.
+#
+# options:
+#   --pages=300: most saved HTML pages to compare and time
+#   --strings=20000: how many strings to generate
+#   --runs=5: timing runs to average over
+
+HTML_EXTENSIONS = (".htm", ".html")
+
+# utils.unescape() before it was rewritten, as it was
+def unescape_before(text):
+
+  def remove_unicode_control(str):
+    remove_re = re.compile('[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]')
+    return remove_re.sub('', str)
+
+  def fixup(m):
+    text = m.group(0)
+    if text[:2] == "&#":
+      # character reference
+      try:
+        if text[:3] == "&#x":
+          return chr(int(text[3:-1], 16))
+        else:
+          return chr(int(text[2:-1]))
+      except ValueError:
+        pass
+    else:
+      # named entity
+      try:
+        text = chr(html.entities.name2codepoint[text[1:-1]])
+      except KeyError:
+        pass
+    return text # leave as is
+
+  text = re.sub(r"&#?\w+;", fixup, text)
+  text = remove_unicode_control(text)
+  return text
+
+NAMED = sorted(html.entities.name2codepoint.keys())
+
+# one piece of a generated string: an entity of some kind (named, unknown,
+# decimal, hex, malformed or out of range), a control character, or text
+def piece(rand):
+  kind = rand.randrange(9)
+  if kind == 0:
+    return "&%s;" % rand.choice(NAMED)
+  elif kind == 1:
+    return "&%s;" % rand.choice(["bogus", "AMP", "nbsp2", "x", "_"])
+  elif kind == 2:
+    return "&#%i;" % rand.randrange(0x110000)
+  elif kind == 3:
+    return "&#x%x;" % rand.randrange(0x110000)
+  elif kind == 4:
+    return rand.choice(["&#;", "&#x;", "&#xzz;", "&#12a;", "& amp;", "&amp", "&&lt;;", "&#-5;"])
+  elif kind == 5:
+    return "&#%i;" % rand.randrange(0x110000, 0x1000000)
+  elif kind == 6:
+    return chr(rand.choice(list(range(0x20)) + [0x7F]))
+  elif kind == 7:
+    return rand.choice(["caf\xe9", "\u2013", "\xa0", "\U0001F600", "\ufeff"])
+  else:
+    return rand.choice(["<p>", "text ", "\n", "\t", "&", ";", "#"])
+
+def generated_strings(count):
+  rand = random.Random(0)
+  for i in range(count):
+    yield "".join(piece(rand) for j in range(rand.randrange(1, 40)))
+
+def saved_pages(limit):
+  found = 0
+  for dirpath, dirnames, filenames in os.walk(utils.data_dir()):
+    dirnames.sort()
+    for filename in sorted(filenames):
+      if os.path.splitext(filename.lower())[1] not in HTML_EXTENSIONS:
+        continue
+      with open(os.path.join(dirpath, filename), encoding="utf-8", errors="replace") as f:
+        yield f.read()
+      found += 1
+      if found >= limit:
+        return
+
+def compare(texts):
+  compared, different = 0, 0
+  for text in texts:
+    compared += 1
+    if unescape_before(text) != utils.unescape(text):
+      different += 1
+      print("Different: %r" % text[:200])
+  return compared, different
+
+def mean_seconds(function, text, runs):
+  return timeit.timeit(lambda: function(text), number=runs) / runs
+
+def run(options):
+  page_limit = int(options.get("pages", 300))
+  string_count = int(options.get("strings", 20000))
+  runs = int(options.get("runs", 5))
+
+  pages = list(saved_pages(page_limit))
+  strings = list(generated_strings(string_count))
+  compared, different = compare(strings + pages)
+  print("Compared %i strings (%i saved pages, %i generated): %i different" % (
+    compared, len(pages), len(strings), different))
+
+  rand = random.Random(1)
+  samples = [
+    ("entity-heavy page", "".join(piece(rand) for i in range(300000))),
+    ("page without entities", "<p>Plain text, caf\xe9 \u2013 no entities.</p>\n" * 50000),
+  ]
+  if pages:
+    samples.append(("saved pages", "".join(pages)))
+
+  for name, text in samples:
+    before = mean_seconds(unescape_before, text, runs)
+    after = mean_seconds(utils.unescape, text, runs)
+    print("%s (%.1fMB): %.0fms -> %.0fms" % (
+      name, len(text.encode("utf-8")) / 1e6, before * 1000, after * 1000))
+
+def main():
+  import sys, os, os.path
+  sys.path.append(os.getcwd())
+  sys.path.append(os.path.abspath(".."))
+  run(utils.options())
+main() if (__name__ == "__main__") else None
@@ -0,0 +1,103 @@
+import os.path
+import unittest
+
+from bs4 import BeautifulSoup
+from bs4.element import NavigableString
+
+from inspectors.utils import segment
+
+# run from the repository root with:
+#   python -m unittest discover test
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+def fixture(name):
+  with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+    return BeautifulSoup(f.read(), "lxml")
+
+# exim's walk before segment.links(): the link's text, preceded by the text
+# back to the previous link or the start of maincontent
+def exim_text_before(a, maincontent):
+  all_text = str(a.text)
+  node = a.previous
+  while True:
+    if is_inside_link(node):
+      break
+    if isinstance(node, NavigableString):
+      all_text = node + all_text
+    node = node.previous
+    if not node:
+      break
+    if node == maincontent:
+      break
+  return all_text
+
+def is_inside_link(node):
+  x = node
+  while x != None:
+    if x.name == "a":
+      return True
+    x = x.parent
+  return False
+
+# hhs's walk before segment.last_before(): the last h2 before result
+def hhs_heading_before(result):
+  node = result
+  while node and node.name != "h2":
+    node = node.previous
+  if node and node.name == "h2":
+    return node
+  return None
+
+class LinksTest(unittest.TestCase):
+  def setUp(self):
+    doc = fixture("exim_paragraph.html")
+    self.maincontent = doc.select("div#CS_Element_eximpagemaincontent")[0]
+    self.links = list(segment.links(self.maincontent))
+
+  def test_finds_every_link_in_order(self):
+    self.assertEqual([link.tag for link in self.links],
+                     self.maincontent.find_all("a"))
+    self.assertEqual([link.href for link in self.links],
+                     [a.get("href") for a in self.maincontent.find_all("a")])
+
+  def test_matches_old_backward_walk(self):
+    for link in self.links:
+      self.assertEqual(link.preceding + link.text,
+                       exim_text_before(link.tag, self.maincontent))
+
+  def test_text_stops_at_previous_link(self):
+    by_href = dict((link.href, link) for link in self.links)
+    response = by_href["/oig/reports/upload/OIG-AR-15-06-Response.pdf"]
+    self.assertEqual(response.preceding, ")\xa0")
+    evaluation = by_href["/oig/reports/upload/OIG-EV-15-02.pdf"]
+    self.assertIn("Loan Guarantee Approval Process \u2013 Part 1 (", evaluation.preceding)
+    self.assertNotIn("June 12", response.preceding)
+
+class LastBeforeTest(unittest.TestCase):
+  def setUp(self):
+    self.doc = fixture("hhs_oei_letter.html")
+    self.results = self.doc.select("#leftContentInterior ul li")
+    self.headings = segment.last_before(self.doc, self.results,
+                                        lambda element: element.name == "h2")
+
+  def test_matches_old_backward_walk(self):
+    for result in self.results:
+      self.assertIs(self.headings[id(result)], hhs_heading_before(result))
+
+  def test_headings(self):
+    names = []
+    for result in self.results:
+      heading = self.headings[id(result)]
+      names.append(heading.text if heading else None)
+    self.assertEqual(names, [
+      "Reports and Publications",
+      "Medicaid", "Medicaid", "Medicaid",
+      "Medical Equipment and Supplies", "Medical Equipment and Supplies",
+      "Medical Equipment and Supplies", "Medical Equipment and Supplies",
+      "Medicare", "Medicare",
+      "Related Content",
+    ])
+
+if __name__ == "__main__":
+  unittest.main()